@@ -0,0 +1,7 @@
+"""
+Benchmarks for the hot paths of Prodict.
+Run a benchmark module from the repository root, like:
+    python -m benchmarks.construction
+Run the whole suite, compared with plain dicts and dataclasses, like:
+    python -m benchmarks --output results.json --compare previous.json
+"""
@@ -0,0 +1,22 @@
+"""
+Decoding a page of records one by one against the bulk API.
+"""
+from benchmarks.common import COMPUTER_DICT, RAM_DICT, Computer, Ram, measure, report
+
+RAM_ROWS = [dict(RAM_DICT, capacity=i) for i in range(10000)]
+COMPUTER_ROWS = [COMPUTER_DICT] * 1000
+
+
+def main():
+    report('[Ram.from_dict(d) for d in 10k rows]', measure(lambda: [Ram.from_dict(d) for d in RAM_ROWS], number=10))
+    report('Ram.from_dicts(10k rows)', measure(lambda: Ram.from_dicts(RAM_ROWS), number=10))
+    report('Ram.from_dicts(10k rows, validate)', measure(lambda: Ram.from_dicts(RAM_ROWS, validate=True), number=10))
+    report('[Computer.from_dict(d) for d in 1k rows]',
+           measure(lambda: [Computer.from_dict(d) for d in COMPUTER_ROWS], number=5))
+    report('Computer.from_dicts(1k rows)', measure(lambda: Computer.from_dicts(COMPUTER_ROWS), number=5))
+    report('Computer.from_dicts(1k rows, validate)',
+           measure(lambda: Computer.from_dicts(COMPUTER_ROWS, validate=True), number=5))
+
+
+if __name__ == '__main__':
+    main()
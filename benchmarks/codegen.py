@@ -0,0 +1,47 @@
+"""
+Generic construction and to_dict against the code generated with 'codegen=True'.
+"""
+from typing import List
+
+from prodict import Prodict
+from benchmarks.common import COMPUTER_DICT, RAM_DICT, Computer, Ram, measure, report
+
+
+class GenRam(Prodict, codegen=True):
+    brand: str
+    capacity: int
+    unit: str
+
+
+class GenCpuCore(Prodict, codegen=True):
+    threads: int
+    clock: float
+    unit: str
+
+
+class GenCpu(Prodict, codegen=True):
+    brand: str
+    model: str
+    cache: int
+    cores: List[GenCpuCore]
+
+
+class GenComputer(Prodict, codegen=True):
+    brand: str
+    cpu: GenCpu
+    rams: List[GenRam]
+    dict_key: dict
+    uninitialized: str
+
+
+def main():
+    for name, ram_class, computer_class in (('generic', Ram, Computer), ('codegen', GenRam, GenComputer)):
+        computer = computer_class.from_dict(COMPUTER_DICT)
+        report('{}: Ram.from_dict'.format(name), measure(lambda: ram_class.from_dict(RAM_DICT)))
+        report('{}: Computer.from_dict'.format(name), measure(lambda: computer_class.from_dict(COMPUTER_DICT)))
+        report('{}: Computer.to_dict(recursive)'.format(name),
+               measure(lambda: computer.to_dict(is_recursive=True)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import dataclasses
+import timeit
+from typing import List, Optional
+
+from prodict import Prodict
+
+
+class Ram(Prodict):
+    brand: str
+    capacity: int
+    unit: str
+
+
+class CpuCore(Prodict):
+    threads: int
+    clock: float
+    unit: str
+
+
+class Cpu(Prodict):
+    brand: str
+    model: str
+    cache: int
+    cores: List[CpuCore]
+
+
+class Computer(Prodict):
+    brand: str
+    cpu: Cpu
+    rams: List[Ram]
+    dict_key: dict
+    uninitialized: str
+
+
+@dataclasses.dataclass
+class RamData:
+    brand: Optional[str] = None
+    capacity: Optional[int] = None
+    unit: Optional[str] = None
+
+
+@dataclasses.dataclass
+class CpuCoreData:
+    threads: Optional[int] = None
+    clock: Optional[float] = None
+    unit: Optional[str] = None
+
+
+@dataclasses.dataclass
+class CpuData:
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    cache: Optional[int] = None
+    cores: List[CpuCoreData] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class ComputerData:
+    brand: Optional[str] = None
+    cpu: Optional[CpuData] = None
+    rams: List[RamData] = dataclasses.field(default_factory=list)
+    dict_key: Optional[dict] = None
+    uninitialized: Optional[str] = None
+
+
+def computer_data(d):
+    """
+    Builds the dataclass equivalent of Computer.from_dict(d), by hand.
+    """
+    cpu = d['cpu']
+    return ComputerData(
+        brand=d['brand'],
+        cpu=CpuData(brand=cpu['brand'], model=cpu['model'], cache=cpu['cache'],
+                    cores=[CpuCoreData(**core) for core in cpu['cores']]),
+        rams=[RamData(**ram) for ram in d['rams']],
+        dict_key=d['dict_key'],
+    )
+
+
+RAM_DICT = {'brand': 'Kingston', 'capacity': 4, 'unit': 'GB'}
+
+COMPUTER_DICT = {
+    'brand': 'acme',
+    'dict_key': {'info': 'This must be a dict'},
+    'rams': [dict(RAM_DICT, capacity=i) for i in range(4)],
+    'cpu': {
+        'brand': 'Intel',
+        'model': 'i5-4670',
+        'cache': 3,
+        'cores': [{'threads': 2, 'clock': 3.4, 'unit': 'GHz'} for _ in range(4)],
+    },
+}
+
+
+def measure(func, number=10000, repeat=5):
+    """
+    Returns the best time of a single call of func in nanoseconds.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def report(name, nanoseconds):
+    print('{:<40} {:>12.0f} ns'.format(name, nanoseconds))
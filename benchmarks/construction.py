@@ -0,0 +1,16 @@
+"""
+Per-object construction cost of Prodict models.
+"""
+from benchmarks.common import COMPUTER_DICT, RAM_DICT, Computer, Ram, measure, report
+
+
+def main():
+    report('dict(**RAM_DICT)', measure(lambda: dict(**RAM_DICT)))
+    report('Ram(**RAM_DICT)', measure(lambda: Ram(**RAM_DICT)))
+    report('Ram.from_dict(RAM_DICT)', measure(lambda: Ram.from_dict(RAM_DICT)))
+    report('Ram()', measure(lambda: Ram()))
+    report('Computer.from_dict(COMPUTER_DICT)', measure(lambda: Computer.from_dict(COMPUTER_DICT), number=2000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""
+Conversion of typed container fields.
+"""
+from typing import Dict, List
+
+from benchmarks.common import RAM_DICT, Ram, measure, report
+from prodict import Prodict
+
+
+class Inventory(Prodict):
+    by_name: Dict[str, List[Ram]]
+    counts: Dict[str, int]
+
+
+INVENTORY_DICT = {
+    'by_name': {'shelf{}'.format(i): [RAM_DICT] for i in range(50000)},
+    'counts': {'item{}'.format(i): str(i) for i in range(50000)},
+}
+
+
+def main():
+    report('Inventory.from_dict(2 x 50k entries)', measure(lambda: Inventory.from_dict(INVENTORY_DICT), number=1))
+
+
+if __name__ == '__main__':
+    main()
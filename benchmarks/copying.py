@@ -0,0 +1,22 @@
+"""
+Pickle size, round-trip and copy time of Prodict models compared with plain dicts.
+"""
+import copy
+import pickle
+
+from benchmarks.common import COMPUTER_DICT, Computer, measure, report
+
+COMPUTER = Computer.from_dict(COMPUTER_DICT)
+PLAIN = COMPUTER.to_dict(is_recursive=True)
+
+
+def main():
+    for name, obj in (('dict', PLAIN), ('Computer', COMPUTER)):
+        print('{:<40} {:>12} bytes'.format('pickle size of ' + name, len(pickle.dumps(obj))))
+        report('pickle round-trip of ' + name, measure(lambda: pickle.loads(pickle.dumps(obj))))
+        report('copy.deepcopy of ' + name, measure(lambda: copy.deepcopy(obj)))
+        report('copy of ' + name, measure(lambda: obj.copy()))
+
+
+if __name__ == '__main__':
+    main()
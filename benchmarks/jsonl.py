@@ -0,0 +1,44 @@
+"""
+Reading and writing a JSON Lines file line by line against read_jsonl and write_jsonl.
+"""
+import json
+import os
+import tempfile
+
+import prodict
+from benchmarks.common import COMPUTER_DICT, Computer, measure, report
+
+ROWS = 20000
+
+
+def read_line_by_line(path):
+    with open(path) as f:
+        return sum(1 for line in f for _ in [Computer.from_dict(json.loads(line))])
+
+
+def read_bulk(path):
+    return sum(len(batch) for batch in Computer.read_jsonl(path, batch_size=1000))
+
+
+def write_line_by_line(models, path):
+    with open(path, 'w') as f:
+        for model in models:
+            f.write(json.dumps(model) + '\n')
+
+
+def main():
+    fd, path = tempfile.mkstemp(suffix='.jsonl')
+    os.close(fd)
+    try:
+        models = [Computer.from_dict(COMPUTER_DICT)] * ROWS
+        prodict.write_jsonl(models, path)
+        report('read line by line (20k rows)', measure(lambda: read_line_by_line(path), number=1, repeat=3))
+        report('Computer.read_jsonl (20k rows)', measure(lambda: read_bulk(path), number=1, repeat=3))
+        report('write line by line (20k rows)', measure(lambda: write_line_by_line(models, path), number=1, repeat=3))
+        report('write_jsonl (20k rows)', measure(lambda: prodict.write_jsonl(models, path), number=1, repeat=3))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
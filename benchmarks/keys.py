@@ -0,0 +1,62 @@
+"""
+Memory retained per record after loading a million JSON lines, where every
+line is parsed on its own, so no two records share their key strings.
+
+    python -m benchmarks.keys
+"""
+import gc
+import json
+import tracemalloc
+
+from prodict import CompactProdict, Prodict
+
+COUNT = 1000000
+
+
+class Product(Prodict):
+    product_id: int
+    title: str
+    price: float
+    in_stock: bool
+    category: str
+
+
+class CompactProduct(CompactProdict):
+    product_id: int
+    title: str
+    price: float
+    in_stock: bool
+    category: str
+
+
+def lines():
+    return [
+        json.dumps({'product_id': i, 'title': 'Product', 'price': 9.5, 'in_stock': True,
+                    'category': 'tools', 'source': 'feed', 'ingested_at': 0})
+        for i in range(COUNT)
+    ]
+
+
+def bytes_per_record(build):
+    source = lines()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(json.loads(line)) for line in source]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(records) == COUNT
+    return (after - before) / COUNT
+
+
+def main():
+    for name, build in (
+            ('dict', dict),
+            ('Prodict', Product.from_dict),
+            ('CompactProdict', CompactProduct.from_dict),
+    ):
+        print('{:<40} {:>12.0f} bytes'.format(name, bytes_per_record(build)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Longest time the event loop is blocked while a large payload is converted,
+with from_dict in a coroutine against afrom_dict.
+"""
+import asyncio
+import time
+from typing import List
+
+from prodict import Prodict
+from benchmarks.common import COMPUTER_DICT, Computer
+
+PAYLOAD = {'computers': [COMPUTER_DICT] * 5000}
+
+
+class Inventory(Prodict):
+    computers: List[Computer]
+
+
+async def longest_block(convert):
+    gaps = []
+    done = False
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await convert()
+    total = time.perf_counter() - started
+    done = True
+    await task
+    return max(gaps), total
+
+
+async def main():
+    async def blocking():
+        return Inventory.from_dict(PAYLOAD)
+
+    for name, convert in (
+            ('from_dict', blocking),
+            ('afrom_dict', lambda: Inventory.afrom_dict(PAYLOAD, chunk_size=100)),
+    ):
+        block, total = await longest_block(convert)
+        print('{:<40} longest block {:>8.1f} ms, total {:>8.1f} ms'.format(name, block * 1e3, total * 1e3))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
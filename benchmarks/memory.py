@@ -0,0 +1,42 @@
+"""
+Memory used per instance, measured with tracemalloc.
+"""
+import gc
+import tracemalloc
+
+from benchmarks.common import RAM_DICT, Ram
+from prodict import CompactProdict, ProdictFrame
+
+COUNT = 100000
+
+
+class CompactRam(CompactProdict):
+    brand: str
+    capacity: int
+    unit: str
+
+
+def bytes_per_instance(build):
+    rows = [dict(RAM_DICT, capacity=i) for i in range(COUNT)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = build(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(instances) == COUNT
+    return (after - before) / COUNT
+
+
+def main():
+    for name, build in (
+            ('dict', lambda rows: [dict(row) for row in rows]),
+            ('Prodict', Ram.from_dicts),
+            ('CompactProdict', CompactRam.from_dicts),
+            ('ProdictFrame', lambda rows: ProdictFrame.from_dicts(Ram, rows)),
+    ):
+        print('{:<40} {:>12.0f} bytes'.format(name, bytes_per_instance(build)))
+
+
+if __name__ == '__main__':
+    main()
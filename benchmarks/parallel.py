@@ -0,0 +1,26 @@
+"""
+Serial bulk conversion against conversion in worker processes.
+Speedups depend on the number of CPUs, workers pay for pickling rows and instances.
+"""
+import os
+
+from benchmarks.common import COMPUTER_DICT, Computer, measure, report
+
+ROWS = [COMPUTER_DICT] * 50000
+# workers=1 converts in the calling process, so at least 2 are used to measure the pool
+WORKERS = max(2, os.cpu_count() or 1)
+
+
+def main():
+    models = Computer.from_dicts(ROWS)
+    report('Computer.from_dicts(50k rows)', measure(lambda: Computer.from_dicts(ROWS), number=1, repeat=3))
+    report('from_dicts(50k rows, workers={})'.format(WORKERS),
+           measure(lambda: Computer.from_dicts(ROWS, workers=WORKERS), number=1, repeat=3))
+    report('Computer.to_dicts(50k, recursive)',
+           measure(lambda: Computer.to_dicts(models, is_recursive=True), number=1, repeat=3))
+    report('to_dicts(50k, recursive, workers={})'.format(WORKERS),
+           measure(lambda: Computer.to_dicts(models, workers=WORKERS, is_recursive=True), number=1, repeat=3))
+
+
+if __name__ == '__main__':
+    main()
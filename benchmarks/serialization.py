@@ -0,0 +1,26 @@
+"""
+Serialization of nested Prodict models to plain dicts.
+"""
+import json
+
+from benchmarks.common import COMPUTER_DICT, Computer, measure, report
+
+COMPUTER = Computer.from_dict(COMPUTER_DICT)
+
+
+def main():
+    report('computer.to_dict()', measure(lambda: COMPUTER.to_dict()))
+    report('computer.to_dict(is_recursive=True)', measure(lambda: COMPUTER.to_dict(is_recursive=True)))
+    report('computer.to_dict(recursive, exclude_none)',
+           measure(lambda: COMPUTER.to_dict(is_recursive=True, exclude_none=True)))
+
+    report('json.dumps(computer.to_dict(recursive))',
+           measure(lambda: json.dumps(COMPUTER.to_dict(is_recursive=True))))
+    report('computer.to_json()', measure(lambda: COMPUTER.to_json()))
+    computer_json = COMPUTER.to_json()
+    report('Computer.from_dict(json.loads(...))', measure(lambda: Computer.from_dict(json.loads(computer_json))))
+    report('Computer.from_json(...)', measure(lambda: Computer.from_json(computer_json)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Runs every hot path of Prodict next to the same operation on plain dicts
+and dataclasses, optionally stores the results as JSON, and compares them
+with the results of a previous run to catch regressions.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare results.json
+"""
+import argparse
+import copy
+import dataclasses
+import json
+import pickle
+import platform
+import sys
+import timeit
+from typing import List
+
+import prodict
+from benchmarks.common import (
+    COMPUTER_DICT, RAM_DICT, Computer, Ram, RamData, computer_data,
+)
+
+RAMS_DICT = {'rams': [dict(RAM_DICT, capacity=i) for i in range(100)]}
+
+
+class Rams(prodict.Prodict):
+    rams: List[Ram]
+
+
+def _dict_without_none(value):
+    # What to_dict(is_recursive=True, exclude_none=True) does, for plain dicts
+    if isinstance(value, dict):
+        return {k: _dict_without_none(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_dict_without_none(item) for item in value]
+    return value
+
+
+def _asdict_without_none(value):
+    return _dict_without_none(dataclasses.asdict(value))
+
+
+def cases():
+    """
+    Returns {name: {'dict': func, 'dataclass': func, 'prodict': func}}.
+    A variant is left out where the operation has no equivalent.
+    """
+    ram, ram_data, ram_dict = Ram.from_dict(RAM_DICT), RamData(**RAM_DICT), dict(RAM_DICT)
+    computer, computer_dc = Computer.from_dict(COMPUTER_DICT), computer_data(COMPUTER_DICT)
+    computer_dict = copy.deepcopy(COMPUTER_DICT)
+    pickled = {
+        'dict': pickle.dumps(computer_dict),
+        'dataclass': pickle.dumps(computer_dc),
+        'prodict': pickle.dumps(computer),
+    }
+
+    def set_dict():
+        ram_dict['capacity'] = 8
+
+    def set_dataclass():
+        ram_data.capacity = 8
+
+    def set_prodict():
+        ram.capacity = 8
+
+    return {
+        'from_dict flat': {
+            'dict': lambda: dict(RAM_DICT),
+            'dataclass': lambda: RamData(**RAM_DICT),
+            'prodict': lambda: Ram.from_dict(RAM_DICT),
+        },
+        'from_dict nested': {
+            'dict': lambda: copy.deepcopy(COMPUTER_DICT),
+            'dataclass': lambda: computer_data(COMPUTER_DICT),
+            'prodict': lambda: Computer.from_dict(COMPUTER_DICT),
+        },
+        'from_dict List[Ram] x100': {
+            'dict': lambda: {'rams': [dict(row) for row in RAMS_DICT['rams']]},
+            'dataclass': lambda: [RamData(**row) for row in RAMS_DICT['rams']],
+            'prodict': lambda: Rams.from_dict(RAMS_DICT),
+        },
+        'get attribute': {
+            'dict': lambda: ram_dict['brand'],
+            'dataclass': lambda: ram_data.brand,
+            'prodict': lambda: ram.brand,
+        },
+        'hasattr missing': {
+            'dict': lambda: 'missing' in ram_dict,
+            'dataclass': lambda: hasattr(ram_data, 'missing'),
+            'prodict': lambda: hasattr(ram, 'missing'),
+        },
+        'set attribute': {
+            'dict': set_dict,
+            'dataclass': set_dataclass,
+            'prodict': set_prodict,
+        },
+        'to_dict recursive exclude_none': {
+            'dict': lambda: _dict_without_none(computer_dict),
+            'dataclass': lambda: _asdict_without_none(computer_dc),
+            'prodict': lambda: computer.to_dict(is_recursive=True, exclude_none=True),
+        },
+        'deepcopy nested': {
+            'dict': lambda: copy.deepcopy(computer_dict),
+            'dataclass': lambda: copy.deepcopy(computer_dc),
+            'prodict': lambda: copy.deepcopy(computer),
+        },
+        'pickle dumps nested': {
+            'dict': lambda: pickle.dumps(computer_dict),
+            'dataclass': lambda: pickle.dumps(computer_dc),
+            'prodict': lambda: pickle.dumps(computer),
+        },
+        'pickle loads nested': {
+            variant: (lambda data=data: pickle.loads(data)) for variant, data in pickled.items()
+        },
+    }
+
+
+def measure(func, repeat):
+    """
+    Returns the best time of a single call of func in nanoseconds, with the
+    number of calls per round picked like 'python -m timeit' does.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def run(repeat=5, selected=None):
+    results = {}
+    for name, variants in cases().items():
+        if selected and not any(word in name for word in selected):
+            continue
+        results[name] = {variant: measure(func, repeat) for variant, func in variants.items()}
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'json_backend': prodict._json_backend,
+    }
+
+
+def print_results(results, baseline=None, threshold=0.1):
+    """
+    Prints the results, and the change of the prodict variant since the baseline.
+    :return: Names of the cases where prodict got slower by more than threshold
+    """
+    regressions = []
+    print('{:<34} {:>12} {:>12} {:>12} {:>9}'.format('case (ns)', 'dict', 'dataclass', 'prodict', 'change'))
+    for name, variants in results.items():
+        cells = ['{:>12.0f}'.format(variants[v]) if v in variants else '{:>12}'.format('-')
+                 for v in ('dict', 'dataclass', 'prodict')]
+        change = ''
+        before = (baseline or {}).get(name, {}).get('prodict')
+        if before:
+            ratio = variants['prodict'] / before - 1
+            change = '{:+.0%}'.format(ratio)
+            if ratio > threshold:
+                regressions.append(name)
+                change += ' !'
+        print('{:<34} {} {:>9}'.format(name, ' '.join(cells), change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-o', '--output', help='store the results in this JSON file')
+    parser.add_argument('-c', '--compare', help='compare with the results stored in this JSON file')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='rounds per case, the best one is kept')
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help='slowdown that counts as a regression, 0.1 is 10%%')
+    parser.add_argument('cases', nargs='*', help='only run the cases that contain one of these words')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    results = run(args.repeat, args.cases)
+    regressions = print_results(results, baseline, args.threshold)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    if regressions:
+        print('Slower than the baseline: {}'.format(', '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
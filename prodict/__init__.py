@@ -1,238 +1,3366 @@
 # Global comments:
 # self is avoided to fix #15
-from typing import Any, List
+from typing import Any, Dict, List, Union
+import array
+import concurrent.futures
 import copy
+import copyreg
+import io
+import itertools
+import linecache
+import operator
+import os
+import sys
+import threading
+import time
+import types
+import weakref
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 DICT_RESERVED_KEYS = vars(dict).keys()
 
+# Annotated types that are their own converter
+_CONSTRUCTOR_TYPES = (float, str, int, list, tuple, set, frozenset)
+# Type of 'X | Y' annotations, Python 3.10+
+_UnionType = getattr(types, 'UnionType', None)
+
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
+_json_backend = 'json'
+
+
+def set_json_backend(name=None):
+    """
+    Selects the module used by 'to_json' and 'from_json'.
+    :param name: One of JSON_BACKENDS, or None for the fastest installed one
+    :return: Name of the selected backend
+    """
+    global _json_backend
+    installed = {'orjson': orjson, 'ujson': ujson, 'json': json}
+    if name is None:
+        name = next(backend for backend in JSON_BACKENDS if installed[backend] is not None)
+    elif name not in installed:
+        raise ValueError('Unknown JSON backend {!r}, use one of {}'.format(name, JSON_BACKENDS))
+    elif installed[name] is None:
+        raise ImportError('JSON backend {!r} is not installed'.format(name))
+    _json_backend = name
+    return name
+
+
+def _json_default(default):
+    # Compact instances are not dicts, so encoders need to be told how to encode them
+    def encode(obj):
+        if isinstance(obj, CompactProdict):
+            return obj.to_dict()
+        if default is None:
+            raise TypeError('Object of type {} is not JSON serializable'.format(type(obj).__name__))
+        return default(obj)
+
+    return encode
+
+
+# Integers orjson and ujson encode natively, 'json' has no limit
+_JSON_INT_MIN = -2 ** 63
+_JSON_INT_MAX = 2 ** 63 - 1
+
+
+def _json_plain(obj):
+    """
+    Tells whether obj holds nothing but str keys and values that every backend
+    encodes to the same text: dicts, lists, tuples, compact instances, str,
+    bool, None, 64 bit integers and floats written without an exponent.
+    Anything else is left to 'json' and the 'default' hook, so all backends
+    accept the same types and produce the same output.
+    """
+    seen = set()
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is str or value_type is bool or value is None:
+            continue
+        if value_type is int:
+            if not _JSON_INT_MIN <= value <= _JSON_INT_MAX:
+                return False
+            continue
+        if value_type is float:
+            # Backends disagree on exponents ('1e+16', '1e16') and on NaN
+            if value != 0.0 and not 1e-4 <= abs(value) < 1e16:
+                return False
+            continue
+        if id(value) in seen:
+            return False
+        if isinstance(value, dict):
+            items = value.items()
+        elif isinstance(value, CompactProdict):
+            items = value.items()
+        elif isinstance(value, (list, tuple)):
+            seen.add(id(value))
+            stack.extend(value)
+            continue
+        else:
+            return False
+        seen.add(id(value))
+        for key, item in items:
+            if type(key) is not str:
+                return False
+            stack.append(item)
+    return True
+
+
+def _json_dumps(obj, default):
+    default = _json_default(default)
+    if _json_backend != 'json' and _json_plain(obj):
+        try:
+            if _json_backend == 'orjson':
+                return orjson.dumps(obj, default=default).decode()
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=default)
+        except (TypeError, UnicodeError):
+            # Lone surrogates in strings, which 'json' writes as they are
+            pass
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':'))
+
+
+def _json_loads(data):
+    if _json_backend == 'orjson':
+        return orjson.loads(data)
+    if _json_backend == 'ujson':
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+# Number of decoded lines converted at once when reading JSON Lines
+JSONL_BATCH_SIZE = 1000
+
+
+# Size in bytes of the blocks of lines read from a JSON Lines file at once
+_JSONL_READ_SIZE = 1 << 20
+
+
+def _jsonl_chunks(source):
+    """
+    Yields the lines of a JSON Lines file in lists. Paths and file objects are
+    read in buffered blocks of about _JSONL_READ_SIZE bytes, split into lines
+    by 'readlines', instead of one line at a time.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from iter(lambda: f.readlines(_JSONL_READ_SIZE), [])
+        return
+    readlines = getattr(source, 'readlines', None)
+    if readlines is not None:
+        yield from iter(lambda: readlines(_JSONL_READ_SIZE), [])
+        return
+    lines = iter(source)
+    yield from iter(lambda: list(itertools.islice(lines, JSONL_BATCH_SIZE)), [])
+
+
+def _read_jsonl(cls, source, batch_size, validate):
+    loads = _json_loads
+    batch = []
+    for lines in _jsonl_chunks(source):
+        batch += [loads(line) for line in lines if not line.isspace()]
+        start = 0
+        while len(batch) - start >= batch_size:
+            yield cls.from_dicts(batch[start:start + batch_size], validate=validate)
+            start += batch_size
+        del batch[:start]
+    if batch:
+        yield cls.from_dicts(batch, validate=validate)
+
+
+def read_jsonl(cls, source, batch_size=None, validate=False):
+    """
+    Reads a JSON Lines file into instances of cls. Lines are decoded and
+    converted in batches, so memory use does not depend on the file size.
+    :param cls: Prodict or CompactProdict subclass
+    :param source: Path or file object opened in text or binary mode
+    :param batch_size: Yield lists of up to this many instances instead of single instances
+    :param validate: Same as in 'from_dicts', error paths start with the index in the batch
+    :return: Iterator of instances, or of lists of instances if batch_size is given
+    """
+    if batch_size is not None:
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive, got {!r}'.format(batch_size))
+        return _read_jsonl(cls, source, batch_size, validate)
+    return (instance
+            for batch in _read_jsonl(cls, source, JSONL_BATCH_SIZE, validate)
+            for instance in batch)
+
+
+def write_jsonl(models, target, exclude_none=False, default=None, batch_size=JSONL_BATCH_SIZE):
+    """
+    Writes models as JSON Lines, one document per line. Lines are joined and
+    written in chunks of batch_size to keep the number of write calls low.
+    :param models: Iterable of Prodict, CompactProdict or dict instances
+    :param target: Path or file object opened in text or binary mode
+    :param exclude_none: Same as in 'to_dict'
+    :param default: Same as in 'to_json'
+    :param batch_size: Number of lines per write call
+    :return: Number of lines written
+    """
+    if isinstance(target, (str, bytes, os.PathLike)):
+        with open(target, 'wb') as f:
+            return write_jsonl(models, f, exclude_none, default, batch_size)
+    binary = not isinstance(target, io.TextIOBase)
+    count = 0
+    lines = []
+    for model in models:
+        if isinstance(model, _MODEL_TYPES):
+            lines.append(model.to_json(exclude_none=exclude_none, default=default))
+        elif exclude_none:
+            lines.append(_json_dumps(_dict_tree(model, True, False), default))
+        else:
+            lines.append(_json_dumps(model, default))
+        if len(lines) >= batch_size:
+            count += _write_lines(target, lines, binary)
+            lines = []
+    if lines:
+        count += _write_lines(target, lines, binary)
+    return count
+
+
+def _write_lines(target, lines, binary):
+    chunk = '\n'.join(lines) + '\n'
+    target.write(chunk.encode() if binary else chunk)
+    return len(lines)
+
+
+class GenericMeta(type):
+    pass
+
+
+def _to_prodict(value):
+    if isinstance(value, Prodict):
+        return value.from_dict(value)
+    if isinstance(value, dict):
+        return Prodict.from_dict(value)
+    return value
+
+
+def _prodict_converter(prodict_class):
+    from_dict = prodict_class.from_dict
+
+    def convert(value):
+        return from_dict(value) if isinstance(value, (dict, CompactProdict)) else value
+
+    return convert
+
+
+def _is_model(attr_type):
+    return isinstance(attr_type, type) and issubclass(attr_type, _MODEL_TYPES)
+
+
+def _items_converter(item_type, container):
+    """
+    Converter for 'List[X]', 'Set[X]', 'Tuple[X, ...]' and the like.
+    None items are kept as they are.
+    """
+    if _is_model(item_type):
+        from_dicts = item_type.from_dicts
+        from_dict = item_type.from_dict
+
+        def convert_item(item):
+            if item is None:
+                return None
+            if not isinstance(item, (dict, CompactProdict)):
+                raise AttributeError("{!r} object has no attribute 'items'".format(type(item).__name__))
+            return from_dict(item)
+
+        def convert_models(value):
+            if not isinstance(value, (list, tuple)):
+                value = list(value)
+            if all(type(item) is dict for item in value):
+                # Items are converted as a batch, resolving the field plan once per list
+                items = from_dicts(value)
+            else:
+                items = [convert_item(item) for item in value]
+            return items if container is list else container(items)
+
+        return convert_models
+
+    convert_item = _compile_converter(item_type)
+    if convert_item is None:
+        return container
+
+    if container is list:
+        def convert_list(value):
+            return [None if item is None else convert_item(item) for item in value]
+
+        return convert_list
+
+    def convert(value):
+        return container([None if item is None else convert_item(item) for item in value])
+
+    return convert
+
+
+def _tuple_converter(item_types):
+    """
+    Converter for 'Tuple[A, B]', which converts items by their position.
+    """
+    convert_items = [_compile_converter(item_type) or _identity for item_type in item_types]
+
+    def convert(value):
+        value = tuple(value)
+        if len(value) != len(convert_items):
+            raise ValueError('Expected {} items, got {}'.format(len(convert_items), len(value)))
+        return tuple(
+            None if item is None else convert_item(item)
+            for convert_item, item in zip(convert_items, value)
+        )
+
+    return convert
+
+
+def _dict_converter(key_type, value_type):
+    """
+    Converter for 'Dict[K, V]'. The result is a plain dict, because
+    keys of a mapping are not necessarily valid attribute names.
+    """
+    convert_key = _compile_converter(key_type) or _identity
+    if _is_model(value_type):
+        convert_value = _prodict_converter(value_type)
+    else:
+        convert_value = _compile_converter(value_type) or _identity
+
+    def convert(value):
+        return {
+            convert_key(k): None if v is None else convert_value(v)
+            for k, v in value.items()
+        }
+
+    return convert
+
+
+def _union_converter(union, member_types):
+    """
+    Converter for 'Union[A, B]' and 'A | B'. Values that are already an instance
+    of a member type are kept, otherwise members are tried in order.
+    """
+    member_types = [t for t in member_types if t is not type(None)]
+    if len(member_types) == 1:
+        # Optional[X], None values are never converted
+        return _compile_converter(member_types[0])
+    if Any in member_types:
+        return None
+    classes = tuple(t for t in member_types if isinstance(t, type))
+    converters = [_compile_converter(t) or _identity for t in member_types]
+
+    def convert(value):
+        if isinstance(value, classes):
+            return value
+        for converter in converters:
+            try:
+                return converter(value)
+            except (AttributeError, TypeError, ValueError):
+                pass
+        raise ValueError('{!r} does not match {}'.format(value, union))
+
+    return convert
+
+
+def _identity(value):
+    return value
+
+
+def _set_values(instance, fields, values):
+    keys = type(instance).__prodict_keys__
+    for attr_name, value in values.items():
+        if attr_name in DICT_RESERVED_KEYS:
+            raise TypeError("You cannot set a reserved name as attribute")
+        if attr_name in fields:
+            # Stored under the key string of the class, shared by all instances
+            attr_name = keys[attr_name]
+            converter = fields[attr_name]
+            if value is not None and converter is not None:
+                value = converter(value)
+        elif isinstance(value, dict):
+            value = _to_prodict(value)
+        dict.__setitem__(instance, attr_name, value)
+
+
+def _set_values_lazy(instance, fields, values):
+    """
+    Like _set_values, but nested values are stored as they are and converted
+    on first access. Values that only need a builtin constructor are converted
+    right away, since it is as cheap as deferring them.
+    """
+    pending = {}
+    keys = type(instance).__prodict_keys__
+    for attr_name, value in values.items():
+        if attr_name in DICT_RESERVED_KEYS:
+            raise TypeError("You cannot set a reserved name as attribute")
+        if attr_name in fields:
+            attr_name = keys[attr_name]
+            converter = fields[attr_name]
+            if value is not None and converter is not None:
+                if isinstance(converter, type):
+                    value = converter(value)
+                else:
+                    pending[attr_name] = converter
+        elif isinstance(value, dict):
+            pending[attr_name] = _to_prodict
+        dict.__setitem__(instance, attr_name, value)
+    if pending:
+        instance.__dict__['__prodict_pending__'] = pending
+
+
+def _resolve(instance, key):
+    pending = instance.__dict__.get('__prodict_pending__')
+    if pending and key in pending:
+        dict.__setitem__(instance, key, pending.pop(key)(dict.__getitem__(instance, key)))
+
+
+def _resolve_all(instance):
+    pending = instance.__dict__.get('__prodict_pending__')
+    while pending:
+        key, converter = pending.popitem()
+        if key in instance:
+            dict.__setitem__(instance, key, converter(dict.__getitem__(instance, key)))
+
+
+def _lazy_getitem(self, key):
+    value = dict.__getitem__(self, key)
+    pending = self.__dict__.get('__prodict_pending__')
+    if pending and key in pending:
+        value = pending.pop(key)(value)
+        dict.__setitem__(self, key, value)
+    return value
+
+
+def _lazy_get(self, key, default=None):
+    if key in self:
+        return _lazy_getitem(self, key)
+    return default
+
+
+def _lazy_pop(self, key, *default):
+    if key in self:
+        _resolve(self, key)
+    return dict.pop(self, key, *default)
+
+
+def _lazy_items(self):
+    _resolve_all(self)
+    return dict.items(self)
+
+
+def _lazy_values(self):
+    _resolve_all(self)
+    return dict.values(self)
+
+
+def _drop_pending(instance, keys):
+    # Values written over or deleted are not converted on access anymore
+    pending = instance.__dict__.get('__prodict_pending__')
+    if pending:
+        for key in keys:
+            pending.pop(key, None)
+
+
+def _lazy_set_attribute(self, attr_name, value):
+    _drop_pending(self, (attr_name,))
+    Prodict.set_attribute(self, attr_name, value)
+
+
+def _lazy_setitem(self, key, value):
+    _drop_pending(self, (key,))
+    dict.__setitem__(self, key, value)
+
+
+def _lazy_delitem(self, key):
+    _drop_pending(self, (key,))
+    dict.__delitem__(self, key)
+
+
+def _lazy_update(self, *args, **kwargs):
+    values = dict(*args, **kwargs)
+    _drop_pending(self, values)
+    dict.update(self, values)
+
+
+def _lazy_ior(self, other):
+    _lazy_update(self, other)
+    return self
+
+
+def _lazy_setdefault(self, key, default=None):
+    if key in self:
+        return _lazy_getitem(self, key)
+    dict.__setitem__(self, key, default)
+    return default
+
+
+def _lazy_popitem(self):
+    key, value = dict.popitem(self)
+    pending = self.__dict__.get('__prodict_pending__')
+    if pending and key in pending:
+        value = pending.pop(key)(value)
+    return key, value
+
+
+def _lazy_clear(self):
+    self.__dict__.pop('__prodict_pending__', None)
+    dict.clear(self)
+
+
+def _lazy_eq(self, other):
+    _resolve_all(self)
+    if isinstance(other, Prodict) and other.__prodict_lazy__:
+        _resolve_all(other)
+    return dict.__eq__(self, other)
+
+
+def _lazy_ne(self, other):
+    result = _lazy_eq(self, other)
+    return result if result is NotImplemented else not result
+
+
+def _lazy_copy(self):
+    _resolve_all(self)
+    return Prodict.copy(self)
+
+
+# Methods replaced in classes defined with 'lazy=True'
+_LAZY_METHODS = {
+    '__getitem__': _lazy_getitem,
+    'get': _lazy_get,
+    'pop': _lazy_pop,
+    'items': _lazy_items,
+    'values': _lazy_values,
+    'set_attribute': _lazy_set_attribute,
+    '__setitem__': _lazy_setitem,
+    '__delitem__': _lazy_delitem,
+    'update': _lazy_update,
+    '__ior__': _lazy_ior,
+    'setdefault': _lazy_setdefault,
+    'popitem': _lazy_popitem,
+    'clear': _lazy_clear,
+    '__eq__': _lazy_eq,
+    '__ne__': _lazy_ne,
+    'copy': _lazy_copy,
+}
+
+
+class _Deleted:
+    def __repr__(self):
+        return 'DELETED'
+
+    def __reduce__(self):
+        return 'DELETED'
+
+
+# Value of deleted keys in 'changes'
+DELETED = _Deleted()
+
+
+def _record_change(instance, key):
+    # Changed keys are the keys of a dict, to keep them in the order they were changed
+    changes = instance.__dict__.get('__prodict_changes__')
+    if changes is None:
+        changes = instance.__dict__['__prodict_changes__'] = {}
+    changes[key] = None
+
+
+def _tracking_set_attribute(self, attr_name, value):
+    (_lazy_set_attribute if self.__prodict_lazy__ else Prodict.set_attribute)(self, attr_name, value)
+    _record_change(self, attr_name)
+
+
+def _untracked(instance, name):
+    # The method that a tracking method wraps, the lazy one in lazy classes
+    if instance.__prodict_lazy__ and name in _LAZY_METHODS:
+        return _LAZY_METHODS[name]
+    return vars(dict)[name]
+
+
+def _tracking_setitem(self, key, value):
+    _untracked(self, '__setitem__')(self, key, value)
+    _record_change(self, key)
+
+
+def _tracking_delitem(self, key):
+    _untracked(self, '__delitem__')(self, key)
+    _record_change(self, key)
+
+
+def _tracking_update(self, *args, **kwargs):
+    values = dict(*args, **kwargs)
+    _untracked(self, 'update')(self, values)
+    for key in values:
+        _record_change(self, key)
+
+
+def _tracking_ior(self, other):
+    _tracking_update(self, other)
+    return self
+
+
+def _tracking_pop(self, key, *default):
+    if key in self:
+        _record_change(self, key)
+    return _untracked(self, 'pop')(self, key, *default)
+
+
+def _tracking_popitem(self):
+    item = _untracked(self, 'popitem')(self)
+    _record_change(self, item[0])
+    return item
+
+
+def _tracking_setdefault(self, key, default=None):
+    if key not in self:
+        _record_change(self, key)
+    return _untracked(self, 'setdefault')(self, key, default)
+
+
+def _tracking_clear(self):
+    for key in self:
+        _record_change(self, key)
+    _untracked(self, 'clear')(self)
+
+
+def _tracking_changes(self) -> dict:
+    """
+    Returns the keys set or deleted since the instance was built or
+    'clear_changes' was called.
+    Changes of nested models that track changes are included with paths like
+    'cpu.brand' and 'rams[2].capacity', unless the nested model itself was replaced.
+    Values changed in place, like an appended list item, are not seen.
+    :return: Dict of path to the current value, DELETED for deleted keys
+    """
+    if not self.__prodict_tracking__:
+        raise TypeError('{} is not defined with track_changes=True'.format(type(self).__name__))
+    result = {}
+    _collect_changes(self, '', result, set())
+    return result
+
+
+def _tracking_clear_changes(self):
+    """
+    Forgets the changes of the instance and of the nested models, for example
+    after they are written back.
+    """
+    _clear_changes(self, set())
+
+
+# Methods added to classes defined with 'track_changes=True', replacing the ones of Prodict
+_TRACKING_METHODS = {
+    'set_attribute': _tracking_set_attribute,
+    '__setitem__': _tracking_setitem,
+    '__delitem__': _tracking_delitem,
+    'update': _tracking_update,
+    '__ior__': _tracking_ior,
+    'pop': _tracking_pop,
+    'popitem': _tracking_popitem,
+    'setdefault': _tracking_setdefault,
+    'clear': _tracking_clear,
+    'changes': _tracking_changes,
+    'clear_changes': _tracking_clear_changes,
+}
+
+
+def _user_method(cls, name):
+    # Whether cls gets the method from a class body between it and Prodict,
+    # rather than from Prodict, dict or a mode
+    for base in cls.__mro__:
+        if base is Prodict:
+            return False
+        method = vars(base).get(name)
+        if method is not None:
+            return getattr(method, '__module__', None) != __name__ and method is not vars(dict).get(name)
+    return False
+
+
+def _install_mode_methods(cls):
+    for name in _LAZY_METHODS.keys() | _TRACKING_METHODS.keys():
+        if _user_method(cls, name):
+            # Methods defined in the class body or a base class are kept
+            continue
+        if cls.__prodict_tracking__ and name in _TRACKING_METHODS:
+            method = _TRACKING_METHODS[name]
+        elif cls.__prodict_lazy__ and name in _LAZY_METHODS:
+            method = _LAZY_METHODS[name]
+        elif name in Prodict.__dict__:
+            # The original, not the replacement installed while counting stats
+            method = _uninstrumented.get((Prodict, name), Prodict.__dict__[name])
+        elif name in vars(dict):
+            method = vars(dict)[name]
+        else:
+            continue
+        setattr(cls, name, method)
+
+
+def _collect_changes(instance, prefix, result, seen):
+    seen.add(id(instance))
+    changes = instance.__dict__.get('__prodict_changes__') or {}
+    for key in changes:
+        result[prefix + str(key)] = instance.get(key, DELETED)
+    for key, value in dict.items(instance):
+        if key in changes:
+            continue
+        if isinstance(value, Prodict):
+            if value.__prodict_tracking__ and id(value) not in seen:
+                _collect_changes(value, '{}{}.'.format(prefix, key), result, seen)
+        elif isinstance(value, (list, tuple)):
+            for index, item in enumerate(value):
+                if isinstance(item, Prodict) and item.__prodict_tracking__ and id(item) not in seen:
+                    _collect_changes(item, '{}{}[{}].'.format(prefix, key, index), result, seen)
+
+
+def _clear_changes(instance, seen):
+    seen.add(id(instance))
+    instance.__dict__.pop('__prodict_changes__', None)
+    for value in dict.values(instance):
+        items = value if isinstance(value, (list, tuple)) else (value,)
+        for item in items:
+            if isinstance(item, Prodict) and item.__prodict_tracking__ and id(item) not in seen:
+                _clear_changes(item, seen)
+
+
+def _run_init(instance):
+    # Attributes set by 'init' are allowed for frozen instances,
+    # and are not changes for instances that track them
+    if instance.__prodict_frozen__:
+        instance.__dict__['__prodict_initializing__'] = True
+        instance.init()
+        del instance.__dict__['__prodict_initializing__']
+    else:
+        instance.init()
+        if instance.__prodict_tracking__:
+            instance.__dict__.pop('__prodict_changes__', None)
+
+
+def _overrides_set_attribute(cls):
+    # Whether the class customizes 'set_attribute'. The versions of Prodict,
+    # FrozenProdict, the lazy and tracking modes and stats are all defined here.
+    return getattr(cls.set_attribute, '__module__', None) != __name__
+
+
+def _customizes_construction(cls):
+    # Whether instances have to be built through 'from_dict', because the
+    # class customizes how they are built
+    if issubclass(cls, CompactProdict):
+        return (cls.from_dict.__func__ is not CompactProdict.from_dict.__func__
+                or cls.__init__ is not CompactProdict.__init__)
+    return (cls.from_dict.__func__ not in (Prodict.from_dict.__func__, FrozenProdict.from_dict.__func__)
+            or cls.__init__ is not Prodict.__init__
+            or cls.__new__ is not Prodict.__new__
+            or cls.__prodict_custom_set_attribute__)
+
+
+# Allocates every Prodict instance, whichever way it is built, see 'enable_stats'
+_allocate = dict.__new__
+
+
+def _update_interned(instance, values):
+    # Like 'dict.update', but annotated keys are stored under the key string of the class
+    keys = type(instance).__prodict_keys__
+    setitem = dict.__setitem__
+    for key, value in values.items():
+        setitem(instance, keys.get(key, key), value)
+
+
+def _populate_with_set_attribute(instance, args, values):
+    """
+    Fills a new instance of a class that overrides 'set_attribute' by calling
+    it for every annotated attribute and every supplied value, so that the
+    override sees all of them.
+    """
+    cls = type(instance)
+    if args:
+        _update_interned(instance, dict(*args))
+    _update_interned(instance, values)
+    if cls.__prodict_frozen__:
+        instance.__dict__['__prodict_initializing__'] = True
+    try:
+        for attr_name in cls.__prodict_fields__:
+            instance.set_attribute(attr_name, None)
+        instance.init()
+        for attr_name, value in values.items():
+            instance.set_attribute(attr_name, value)
+    finally:
+        instance.__dict__.pop('__prodict_initializing__', None)
+    if cls.__prodict_frozen__:
+        _freeze_values(instance, dict.keys(instance))
+    if cls.__prodict_tracking__:
+        instance.__dict__.pop('__prodict_changes__', None)
+
+
+def _populate(instance, args, values):
+    """
+    Fills a new instance in a single pass: converted values for the supplied
+    keys, None for the missing annotated keys and positional items as they are.
+    """
+    cls = type(instance)
+    if cls.__prodict_custom_set_attribute__:
+        _populate_with_set_attribute(instance, args, values)
+        return
+    if cls.__prodict_codegen__ and not args:
+        fill = _generated(cls).fill
+        if fill is not None:
+            fill(instance, values)
+            return
+    fields = cls.__prodict_fields__
+    set_values = _set_values_lazy if cls.__prodict_lazy__ else _set_values
+    if cls.init is not Prodict.init:
+        # 'init' sees the raw values with annotated attributes set to None,
+        # and the supplied values override whatever 'init' sets.
+        if args:
+            _update_interned(instance, dict(*args))
+        _update_interned(instance, values)
+        dict.update(instance, dict.fromkeys(fields))
+        _run_init(instance)
+        set_values(instance, fields, values)
+    else:
+        if args:
+            _update_interned(instance, dict(*args))
+            # #3: Annotated attributes given as positional items are reset to None
+            for attr_name in fields:
+                if attr_name in instance:
+                    dict.__setitem__(instance, attr_name, None)
+        set_values(instance, fields, values)
+        # #3: Set all missing properties to None
+        for attr_name in fields:
+            if attr_name not in instance:
+                dict.__setitem__(instance, attr_name, None)
+    if cls.__prodict_frozen__:
+        _freeze_values(instance, dict.keys(instance))
+
+
+def _row_builder(cls):
+    """
+    Returns a function that builds an instance of cls from a dict, with the
+    field plan of the class resolved once, to be applied to many rows.
+    """
+    if (cls.from_dict.__func__ is not Prodict.from_dict.__func__
+            or cls.__init__ is not Prodict.__init__
+            or cls.__new__ is not Prodict.__new__
+            or cls.__prodict_custom_set_attribute__):
+        return cls.from_dict
+
+    if cls.__prodict_codegen__ and _generated(cls).build is not None:
+        return _generated(cls).build
+
+    if cls.init is not Prodict.init or cls.__prodict_lazy__ or cls.__prodict_frozen__:
+        def build_with_populate(row):
+            instance = _allocate(cls)
+            _populate(instance, (), row)
+            return instance
+
+        return build_with_populate
+
+    fields = cls.__prodict_fields__
+    keys = cls.__prodict_keys__
+    new = _allocate
+    setitem = dict.__setitem__
+
+    def build(row):
+        instance = new(cls)
+        for attr_name, value in row.items():
+            if attr_name in DICT_RESERVED_KEYS:
+                raise TypeError("You cannot set a reserved name as attribute")
+            if attr_name in fields:
+                attr_name = keys[attr_name]
+                converter = fields[attr_name]
+                if value is not None and converter is not None:
+                    value = converter(value)
+            elif isinstance(value, dict):
+                value = _to_prodict(value)
+            setitem(instance, attr_name, value)
+        for attr_name in fields:
+            if attr_name not in instance:
+                setitem(instance, attr_name, None)
+        return instance
+
+    return build
+
+
+def _own_annotations(cls):
+    if sys.version_info >= (3, 10):
+        # Class annotations are no longer inherited from the bases
+        return getattr(cls, '__annotations__', None) or {}
+    return cls.__dict__.get('__annotations__', {})
+
+
+def _compile_converter(attr_type):
+    """
+    Resolves an annotated type into a converter once, so that assignments
+    don't have to inspect the annotation again. Containers like 'List[X]',
+    'Dict[K, V]', 'Optional[X]' and 'Union[A, B]' get nested converters,
+    so do their builtin and PEP 604 forms like 'list[X]' and 'X | None'.
+    Returns None if values should be stored as they are.
+    """
+    if attr_type is Any:
+        return None
+    if attr_type in _CONSTRUCTOR_TYPES:
+        return attr_type
+    if attr_type is dict or attr_type is Dict:
+        return _to_prodict
+    if _is_model(attr_type):
+        return _prodict_converter(attr_type)
+    if attr_type is List:
+        return list
+    args = getattr(attr_type, '__args__', None) or ()
+    if _UnionType is not None and isinstance(attr_type, _UnionType):
+        return _union_converter(attr_type, args)
+    origin = getattr(attr_type, '__origin__', None)
+    if origin is Union:
+        return _union_converter(attr_type, args)
+    if origin in (list, set, frozenset):
+        # if the type is 'List[something]'
+        return _items_converter(args[0], origin) if args else origin
+    if origin is tuple:
+        if len(args) == 2 and args[1] is Ellipsis:
+            return _items_converter(args[0], tuple)
+        if not args or args == ((),):
+            return tuple
+        return _tuple_converter(args)
+    if origin is dict:
+        return _dict_converter(*args) if len(args) == 2 else _to_prodict
+    return None
+
+
+class ValidationError(ValueError):
+    """
+    Raised by 'from_dict' and 'from_dicts' in validation mode, with every error
+    found in the data.
+    errors: List of (path, message) tuples, paths are like 'cpu.cores[3].clock'
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        lines = ['{}: {}'.format(path or '<root>', message) for path, message in errors]
+        super().__init__('{} validation error(s)\n  {}'.format(len(errors), '\n  '.join(lines)))
+
+
+def _format_path(path):
+    """
+    Paths are built as (parent, segment) pairs and formatted only when an error
+    is recorded. Segments are attribute names, list indexes, or dict keys in a tuple.
+    """
+    segments = []
+    while path is not None:
+        path, segment = path
+        if isinstance(segment, int):
+            segments.append('[{}]'.format(segment))
+        elif isinstance(segment, tuple):
+            segments.append('[{!r}]'.format(segment[0]))
+        else:
+            segments.append('.' + segment)
+    return ''.join(reversed(segments)).lstrip('.')
+
+
+def _error_message(exc):
+    return '{}: {}'.format(type(exc).__name__, exc)
+
+
+def _validate_rows(cls, rows, single=False, offset=0):
+    errors = []
+    if single:
+        result = _validated(cls, rows[0], None, errors)
+    else:
+        result = [_validated(cls, row, (None, index), errors) for index, row in enumerate(rows, offset)]
+    if errors:
+        raise ValidationError(errors)
+    return result
+
+
+def _validated(cls, data, path, errors):
+    """
+    Builds an instance of cls like 'from_dict' does, but records every value
+    that can't be converted in errors instead of raising, and goes on.
+    Invalid values are kept as they are.
+    """
+    if not isinstance(data, (dict, CompactProdict)):
+        errors.append((_format_path(path), 'expected a dict, got {}'.format(type(data).__name__)))
+        return data
+    validators = cls.__prodict_validators__
+    if validators is None:
+        validators = cls.__prodict_validators__ = {
+            attr_name: _compile_validator(attr_type) for attr_name, attr_type in cls.attr_types().items()
+        }
+    values = {}
+    error_count = len(errors)
+    for key, value in data.items():
+        if key in DICT_RESERVED_KEYS:
+            errors.append((_format_path((path, key)), 'reserved name'))
+            continue
+        if value is not None:
+            if key in validators:
+                value = validators[key](value, (path, key), errors)
+            elif isinstance(value, dict):
+                value = _to_prodict(value)
+        values[key] = value
+    if len(errors) == error_count and _customizes_construction(cls):
+        # Valid data is built again the way the class builds it
+        return cls.from_dict(data)
+    return cls.from_converted(values)
+
+
+def _compile_validator(attr_type):
+    """
+    Validating counterpart of '_compile_converter'. Validators are called as
+    validator(value, path, errors) and return the converted value.
+    """
+    if _is_model(attr_type):
+        def validate_model(value, path, errors):
+            return _validated(attr_type, value, path, errors)
+
+        return validate_model
+
+    args = getattr(attr_type, '__args__', None) or ()
+    origin = getattr(attr_type, '__origin__', None)
+    is_union = origin is Union or (_UnionType is not None and isinstance(attr_type, _UnionType))
+    if is_union and len([t for t in args if t is not type(None)]) == 1:
+        return _compile_validator(next(t for t in args if t is not type(None)))
+
+    if args and (origin in (list, set, frozenset) or (origin is tuple and args[-1] is Ellipsis)):
+        validate_item = _compile_validator(args[0])
+
+        def validate_items(value, path, errors):
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                errors.append((_format_path(path), 'expected a list, got {}'.format(type(value).__name__)))
+                return value
+            items = [
+                None if item is None else validate_item(item, (path, index), errors)
+                for index, item in enumerate(value)
+            ]
+            return items if origin is list else origin(items)
+
+        return validate_items
+
+    if origin is dict and len(args) == 2:
+        convert_key = _compile_converter(args[0]) or _identity
+        validate_value = _compile_validator(args[1])
+
+        def validate_dict(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append((_format_path(path), 'expected a dict, got {}'.format(type(value).__name__)))
+                return value
+            converted = {}
+            for key, item in value.items():
+                item_path = (path, (key,))
+                try:
+                    key = convert_key(key)
+                except (TypeError, ValueError) as exc:
+                    errors.append((_format_path(item_path), _error_message(exc)))
+                converted[key] = None if item is None else validate_value(item, item_path, errors)
+            return converted
+
+        return validate_dict
+
+    converter = _compile_converter(attr_type)
+    if converter is None:
+        return _validate_any
+
+    def validate(value, path, errors):
+        try:
+            return converter(value)
+        except (TypeError, ValueError) as exc:
+            errors.append((_format_path(path), _error_message(exc)))
+            return value
+
+    return validate
+
+
+def _validate_any(value, path, errors):
+    return value
+
+
+# Batches smaller than this are converted in the calling process even if workers are requested
+PARALLEL_THRESHOLD = 10000
+
+
+def _check_importable(cls):
+    """
+    Worker processes receive classes by reference, so they must be importable by name.
+    """
+    obj = sys.modules.get(cls.__module__)
+    for name in cls.__qualname__.split('.'):
+        obj = getattr(obj, name, None)
+    if obj is not cls:
+        raise TypeError(
+            '{}.{} can not be used with workers because it is not importable by name, '
+            'define it at module level'.format(cls.__module__, cls.__qualname__))
+
+
+def _parallel_map(func, items, workers, *args):
+    """
+    Splits items into chunks, runs func(chunk, offset, *args) on each chunk in a
+    process pool and returns the results in the order of the chunks.
+    """
+    chunk_size = -(-len(items) // (workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, items[offset:offset + chunk_size], offset, *args)
+                   for offset in range(0, len(items), chunk_size)]
+        return [future.result() for future in futures]
+
+
+def _from_dicts_chunk(rows, offset, cls, validate):
+    if not validate:
+        return cls.from_dicts(rows), None
+    try:
+        return _validate_rows(cls, rows, offset=offset), None
+    except ValidationError as exc:
+        return None, exc.errors
+
+
+def _from_dicts_parallel(cls, rows, validate, workers):
+    _check_importable(cls)
+    if not isinstance(rows, (list, tuple)):
+        rows = list(rows)
+    if workers < 2 or len(rows) < PARALLEL_THRESHOLD:
+        return cls.from_dicts(rows, validate=validate)
+    result = []
+    errors = []
+    for instances, chunk_errors in _parallel_map(_from_dicts_chunk, rows, workers, cls, validate):
+        if chunk_errors:
+            errors.extend(chunk_errors)
+        elif not errors:
+            result.extend(instances)
+    if errors:
+        raise ValidationError(errors)
+    return result
+
+
+def _to_dicts_chunk(models, offset, kwargs):
+    return [model.to_dict(**kwargs) for model in models]
+
+
+def _to_dicts(models, workers, kwargs):
+    if workers is None:
+        return [model.to_dict(**kwargs) for model in models]
+    if not isinstance(models, (list, tuple)):
+        models = list(models)
+    for model_type in set(map(type, models)):
+        _check_importable(model_type)
+    if workers < 2 or len(models) < PARALLEL_THRESHOLD:
+        return [model.to_dict(**kwargs) for model in models]
+    result = []
+    for dicts in _parallel_map(_to_dicts_chunk, models, workers, kwargs):
+        result.extend(dicts)
+    return result
+
+
+# Number of list items converted between two yields to the event loop
+ASYNC_CHUNK_SIZE = 1000
+
+
+async def _run_chunk(executor, func, *args):
+    """
+    Runs func in executor if one is given, otherwise in the event loop and
+    then lets the other tasks run.
+    """
+    import asyncio  # Already imported when there is a running loop, not imported with prodict
+    if executor is None:
+        result = func(*args)
+        await asyncio.sleep(0)
+        return result
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def _convert_model_items(model, items):
+    # Converts a chunk of a 'List[Model]' value, a module level function so that process executors can run it
+    convert = _prodict_converter(model)
+    return [None if item is None else convert(item) for item in items]
+
+
+async def _afrom_dict(cls, d, chunk_size, executor):
+    """
+    Converts d like 'from_dict', with 'List[Model]' values converted in chunks
+    and nested models converted the same way.
+    """
+    if not issubclass(cls, Prodict) or _customizes_construction(cls):
+        return await _run_chunk(executor, cls.from_dict, d)
+    fields = cls.__prodict_fields__
+    values = {}
+    for key, value in d.items():
+        if key in DICT_RESERVED_KEYS:
+            raise TypeError("You cannot set a reserved name as attribute")
+        if key not in fields:
+            converter = _to_prodict if isinstance(value, dict) else None
+        else:
+            converter = fields[key]
+        if value is not None and converter is not None:
+            model, is_list = _field_model(cls.__prodict_types__[key]) if key in fields else (None, False)
+            if model is not None and is_list and type(value) is list:
+                items = []
+                for start in range(0, len(value), chunk_size):
+                    items += await _run_chunk(executor, _convert_model_items, model, value[start:start + chunk_size])
+                value = items
+            elif model is not None and not is_list and type(value) is dict:
+                value = await _afrom_dict(model, value, chunk_size, executor)
+            else:
+                value = converter(value)
+        values[key] = value
+    return cls.from_converted(values)
+
+
+def _decode_jsonl_batch(cls, lines):
+    # A module level function so that process executors can run it
+    loads = _json_loads
+    return cls.from_dicts([loads(line) for line in lines if line and not line.isspace()])
+
+
+async def _aread_jsonl(cls, stream, batch_size, executor):
+    buffer = bytearray()
+    lines = []
+    async for chunk in stream:
+        buffer += chunk.encode() if isinstance(chunk, str) else chunk
+        end = buffer.rfind(b'\n')
+        if end < 0:
+            continue
+        lines += bytes(buffer[:end]).split(b'\n')
+        del buffer[:end + 1]
+        if len(lines) >= batch_size:
+            full = len(lines) - len(lines) % batch_size
+            for start in range(0, full, batch_size):
+                yield await _run_chunk(executor, _decode_jsonl_batch, cls, lines[start:start + batch_size])
+            del lines[:full]
+    if buffer:
+        lines.append(bytes(buffer))
+    for start in range(0, len(lines), batch_size):
+        yield await _run_chunk(executor, _decode_jsonl_batch, cls, lines[start:start + batch_size])
+
+
+async def aread_jsonl(cls, stream, batch_size=None, executor=None):
+    """
+    Reads JSON Lines from an async stream into instances of cls, like 'read_jsonl'.
+    Every batch of lines is decoded and converted at once, then the event loop
+    runs other tasks, or the batch is decoded and converted in executor.
+    :param cls: Prodict or CompactProdict subclass
+    :param stream: Async iterable of bytes, like the content of an aiohttp response
+    :param batch_size: Yield lists of up to this many instances instead of single instances
+    :param executor: Thread or process pool to decode the batches in, cls must be
+        importable by name for a process pool
+    :return: Async iterator of instances, or of lists of instances if batch_size is given
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError('batch_size must be positive, got {!r}'.format(batch_size))
+    async for batch in _aread_jsonl(cls, stream, batch_size or JSONL_BATCH_SIZE, executor):
+        if batch_size is not None:
+            if batch:
+                yield batch
+        else:
+            for instance in batch:
+                yield instance
+
+
+# Values of these types are leaves for to_dict, they are never walked into
+_SCALAR_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+def _shallow_dict(pairs, exclude_none, exclude_none_in_lists):
+    ret = {}
+    for k, v in pairs:
+        if v is None and exclude_none:
+            continue
+        if exclude_none_in_lists and isinstance(v, list):
+            v = [
+                item.to_dict(exclude_none=True)
+                if isinstance(item, _MODEL_TYPES)
+                else item
+                for item in v
+            ]
+        ret[k] = v
+    return ret
+
+
+def _is_immutable_tuple(value):
+    return type(value) is tuple and all(type(item) in _SCALAR_TYPES for item in value)
+
+
+def _dict_tree(root, exclude_none, exclude_none_in_lists):
+    """
+    Converts a Prodict and everything nested in it (Prodicts, dicts, lists and
+    tuples) into plain dicts, lists and tuples.
+    Walks the tree with an explicit stack, so deep trees don't hit the recursion limit.
+    None values are excluded from Prodicts if 'exclude_none', and from Prodicts
+    inside lists and tuples, at any depth, if 'exclude_none_in_lists'.
+    """
+    result = {}
+    # (source, target, whether nested Prodicts exclude None, whether source excludes None)
+    stack = [(root, result, exclude_none, exclude_none)]
+    # Converted objects by the id of their source, so shared and cyclic references are kept
+    memo = {id(root): result}
+    # Tuples are built as lists first, and replaced once their items are converted
+    tuples = []
+    scalar_types = _SCALAR_TYPES
+    prodict_to_dict = Prodict.to_dict
+
+    def nested(value, exclude, target, key):
+        # Returns the converted value, or an empty container to be filled later
+        converted = memo.get(id(value))
+        if converted is not None:
+            return converted
+        if isinstance(value, Prodict):
+            if type(value).to_dict is not prodict_to_dict:
+                return value.to_dict(is_recursive=True, exclude_none=exclude,
+                                     exclude_none_in_lists=exclude_none_in_lists)
+            converted = memo[id(value)] = {}
+            stack.append((value, converted, exclude, exclude))
+        elif isinstance(value, CompactProdict):
+            converted = memo[id(value)] = {}
+            stack.append((value, converted, exclude, exclude))
+        elif isinstance(value, dict):
+            converted = memo[id(value)] = {}
+            stack.append((value, converted, exclude, False))
+        elif isinstance(value, list):
+            converted = memo[id(value)] = []
+            stack.append((value, converted, exclude, False))
+        elif type(value) is tuple:
+            converted = []
+            stack.append((value, converted, exclude, False))
+            tuples.append((target, key, converted))
+        else:
+            return value
+        return converted
+
+    while stack:
+        source, target, exclude, drop_none = stack.pop()
+        if type(target) is dict:
+            for key, value in source.items():
+                if value is None:
+                    if drop_none:
+                        continue
+                elif type(value) not in scalar_types:
+                    value = nested(value, exclude, target, key)
+                target[key] = value
+        else:
+            exclude = exclude or exclude_none_in_lists
+            append = target.append
+            for index, value in enumerate(source):
+                if value is not None and type(value) not in scalar_types:
+                    value = nested(value, exclude, target, index)
+                append(value)
+    # Inner tuples are registered after the outer ones, so they are built first
+    for target, key, items in reversed(tuples):
+        target[key] = tuple(items)
+    return result
+
+
+# Compiled code of generated functions by their source, classes with the same shape share it
+_codegen_cache = {}
+
+
+def _field_model(attr_type):
+    """
+    Returns the model class of a 'Model' or 'List[Model]' annotation, and whether it is a list.
+    """
+    if _is_model(attr_type):
+        return attr_type, False
+    args = getattr(attr_type, '__args__', None) or ()
+    if getattr(attr_type, '__origin__', None) is list and len(args) == 1 and _is_model(args[0]):
+        return args[0], True
+    return None, False
+
+
+def _codegen_refs(cls):
+    # Model classes with generated code that cls refers to through its annotations
+    refs = set()
+    for attr_type in cls.__prodict_types__.values():
+        model, _ = _field_model(attr_type)
+        if model is not None and getattr(model, '__prodict_codegen__', False):
+            refs.add(model)
+    return refs
+
+
+def _reaches(start, target):
+    seen = set()
+    stack = [start]
+    while stack:
+        model = stack.pop()
+        if model is target:
+            return True
+        if model not in seen:
+            seen.add(model)
+            stack.extend(_codegen_refs(model))
+    return False
+
+
+def _can_build(cls):
+    return (issubclass(cls, Prodict)
+            and cls.init is Prodict.init
+            and cls.from_dict.__func__ is Prodict.from_dict.__func__
+            and cls.__init__ is Prodict.__init__
+            and cls.__new__ is Prodict.__new__
+            and not cls.__prodict_custom_set_attribute__
+            and not cls.__prodict_lazy__
+            and not cls.__prodict_frozen__)
+
+
+def _codegen_source(cls, namespace):
+    """
+    Writes the source of 'fill(instance, row)', 'build(row)' and 'dump(instance)'
+    for cls, and puts the objects they refer to in namespace.
+    Fields are inlined in the order of the annotations, nested models with
+    generated code are built and dumped by their own generated functions,
+    unless they refer back to cls.
+    """
+    fields = cls.__prodict_fields__
+    body = []
+    dump_items = []
+    for index, (attr_name, converter) in enumerate(fields.items()):
+        key = repr(attr_name)
+        if attr_name in DICT_RESERVED_KEYS:
+            body += ['if {} in row:'.format(key),
+                     '    raise TypeError("You cannot set a reserved name as attribute")']
+        model, is_list = _field_model(cls.__prodict_types__[attr_name])
+        nested = (model is not None and getattr(model, '__prodict_codegen__', False)
+                  and not _reaches(model, cls))
+        body.append('value = get({})'.format(key))
+        if converter is not None:
+            namespace['_c{}'.format(index)] = converter
+            body.append('if value is not None:')
+            if nested and _can_build(model):
+                namespace['_b{}'.format(index)] = _generated(model).build
+                if is_list:
+                    namespace['_i{}'.format(index)] = _prodict_converter(model)
+                    body += ['    if type(value) is list:',
+                             '        value = [_b{0}(item) if type(item) is dict else'
+                             ' None if item is None else _i{0}(item) for item in value]'.format(index),
+                             '    else:',
+                             '        value = _c{}(value)'.format(index)]
+                else:
+                    body.append('    value = _b{0}(value) if type(value) is dict else _c{0}(value)'.format(index))
+            else:
+                body.append('    value = _c{}(value)'.format(index))
+        body.append('setitem(instance, {}, value)'.format(key))
+
+        if nested and _generated(model).dump is not None:
+            namespace['_m{}'.format(index)] = model
+            namespace['_d{}'.format(index)] = _generated(model).dump
+            if is_list:
+                item = '[_d{0}(item) if type(item) is _m{0} else _tree(item) for item in v{0}]' \
+                       ' if type(v{0}) is list else _tree(v{0})'.format(index)
+            else:
+                item = '_d{0}(v{0}) if type(v{0}) is _m{0} else _tree(v{0})'.format(index)
+        else:
+            item = 'v{0} if type(v{0}) in _scalars else _tree(v{0})'.format(index)
+        dump_items.append('        {}: {},'.format(key, item))
+    body += ['if len(row) > {} or not row.keys() <= _names:'.format(len(fields)),
+             '    _set_extras(instance, row, _names)']
+
+    lines = ['def fill(instance, row):', '    get = row.get']
+    lines += ['    ' + line for line in body]
+    lines += ['', '', 'def build(row):', '    instance = new(cls)', '    get = row.get']
+    lines += ['    ' + line for line in body]
+    lines += ['    return instance', '', '',
+              'def dump(instance):',
+              '    if tuple(keys(instance)) != _order:',
+              '        return _dict_tree(instance, False, False)']
+    if fields:
+        lines.append('    {}, = values(instance)'.format(', '.join('v{}'.format(i) for i in range(len(fields)))))
+    lines += ['    return {'] + dump_items + ['    }', '']
+    return '\n'.join(lines)
+
+
+def _set_extras(instance, row, names):
+    # Keys of a row that are not annotated, for generated 'fill' and 'build'
+    for key, value in row.items():
+        if key not in names:
+            if key in DICT_RESERVED_KEYS:
+                raise TypeError("You cannot set a reserved name as attribute")
+            if isinstance(value, dict):
+                value = _to_prodict(value)
+            dict.__setitem__(instance, key, value)
+
+
+def _tree_value(value):
+    if type(value) in _SCALAR_TYPES:
+        return value
+    return _dict_tree({None: value}, False, False)[None]
+
+
+def _generated(cls):
+    """
+    Returns the generated functions of a class defined with 'codegen=True',
+    generating them on first use so that defining a class stays cheap.
+    'fill' and 'build' are None if the class customizes construction.
+    """
+    # Every class gets its own '__prodict_generated__' from 'rebuild_fields'
+    generated = cls.__prodict_generated__
+    if generated is not None:
+        return generated
+    namespace = {
+        'cls': cls,
+        'new': _allocate,
+        'setitem': dict.__setitem__,
+        'keys': dict.keys,
+        'values': dict.values,
+        '_names': frozenset(cls.__prodict_fields__),
+        '_order': tuple(cls.__prodict_fields__),
+        '_scalars': _SCALAR_TYPES,
+        '_tree': _tree_value,
+        '_dict_tree': _dict_tree,
+        '_set_extras': _set_extras,
+    }
+    source = _codegen_source(cls, namespace)
+    code = _codegen_cache.get(source)
+    if code is None:
+        filename = '<prodict generated {}.{}>'.format(cls.__module__, cls.__qualname__)
+        code = _codegen_cache[source] = compile(source, filename, 'exec')
+        # Lets tracebacks and debuggers show the generated lines
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(code, namespace)
+    can_build = _can_build(cls)
+    generated = types.SimpleNamespace(
+        source=source,
+        fill=namespace['fill'] if can_build else None,
+        build=namespace['build'] if can_build else None,
+        dump=None if cls.__prodict_lazy__ or _reaches_self(cls) else namespace['dump'],
+    )
+    cls.__prodict_generated__ = generated
+    return generated
+
+
+def _reaches_self(cls):
+    return any(_reaches(model, cls) for model in _codegen_refs(cls))
+
+
+_MISSING = object()
+
+
+class _FieldProperty(property):
+    """
+    Installed on Prodict classes for annotated attributes, so that reading one
+    gets the value from the dict directly, instead of after a failed attribute
+    lookup in '__getattr__'. Keys that were deleted still raise AttributeError.
+    Assignments still go through '__setattr__'.
+    """
+
+
+def _field_getter(attr_name):
+    def getter(self):
+        try:
+            return self[attr_name]
+        except KeyError:
+            # Python falls back to '__getattr__', which raises the usual error
+            raise AttributeError(attr_name) from None
+
+    return getter
+
+
+def _install_field_properties(cls):
+    fields = cls.__prodict_fields__
+    for name, value in list(vars(cls).items()):
+        if isinstance(value, _FieldProperty) and name not in fields:
+            delattr(cls, name)
+    for attr_name in fields:
+        # Class attributes, like default values and methods, keep their priority
+        if getattr(cls, attr_name, _MISSING) is _MISSING:
+            setattr(cls, attr_name, _FieldProperty(_field_getter(attr_name)))
+
+
+# noinspection PyMethodParameters
+class Prodict(dict):
+    """
+    Prodict = Dictionary with IDE friendly(auto code completion),
+    dot-accessible attributes and more.
+    """
+    # Annotations of the class merged with the ones of its bases
+    __prodict_types__ = {}
+    # Validating converters, compiled when they are first needed
+    __prodict_validators__ = None
+    # Converter of every annotated attribute, compiled once per class.
+    # An attribute mapped to None is stored without any conversion.
+    __prodict_fields__ = {}
+    # Interned name of every annotated attribute, mapped to itself, so that
+    # instances store the same key strings instead of the ones of their input
+    __prodict_keys__ = {}
+    # Whether nested values are converted on first access instead of on assignment
+    __prodict_lazy__ = False
+    # Whether instances are immutable, see FrozenProdict
+    __prodict_frozen__ = False
+    # Whether construction and 'to_dict' use code generated for the class
+    __prodict_codegen__ = False
+    # Generated functions, generated when they are first needed
+    __prodict_generated__ = None
+    # Whether changed keys are recorded, see 'changes'
+    __prodict_tracking__ = False
+    # Whether the class overrides 'set_attribute', which construction then calls
+    __prodict_custom_set_attribute__ = False
+
+    def __init_subclass__(cls, lazy=None, codegen=None, track_changes=None, **kwargs):
+        """
+        :param lazy: If True, nested dicts and lists are kept as they are and
+            converted only when they are first accessed by attribute, '[]', 'get',
+            'pop', 'items' or 'values', which 'to_dict' also uses. Subclasses inherit the mode.
+        :param codegen: If True, a constructor and a recursive 'to_dict' with the
+            fields and converters of the class inlined are generated on first use.
+            Annotated keys are stored in the order of the annotations, then the other keys.
+            Subclasses inherit the mode.
+        :param track_changes: If True, keys that are set or deleted after the
+            instance is built are recorded, see 'changes'. Subclasses inherit the mode.
+        """
+        super().__init_subclass__(**kwargs)
+        if codegen is not None:
+            cls.__prodict_codegen__ = bool(codegen)
+        modes = cls.__prodict_lazy__, cls.__prodict_tracking__
+        if lazy is not None:
+            cls.__prodict_lazy__ = bool(lazy)
+        if track_changes is not None:
+            cls.__prodict_tracking__ = bool(track_changes)
+        if (cls.__prodict_lazy__, cls.__prodict_tracking__) != modes:
+            _install_mode_methods(cls)
+        if cls.__prodict_lazy__ and cls.__prodict_frozen__:
+            raise TypeError("A frozen class can't be lazy")
+        if cls.__prodict_tracking__ and cls.__prodict_frozen__:
+            raise TypeError("A frozen class can't track changes")
+        cls.rebuild_fields()
+
+    @classmethod
+    def rebuild_fields(cls):
+        """
+        Compiles the annotations of the class and its bases into converters.
+        Call it again if the annotations are changed after the class is created,
+        subclasses are rebuilt too.
+        """
+        attr_types = {}
+        for base in reversed(cls.__mro__):
+            attr_types.update(_own_annotations(base))
+        cls.__prodict_types__ = attr_types
+        cls.__prodict_validators__ = None
+        cls.__prodict_generated__ = None
+        cls.__prodict_fields__ = {
+            sys.intern(attr_name): _compile_converter(attr_type)
+            for attr_name, attr_type in cls.attr_types().items()
+        }
+        cls.__prodict_keys__ = {attr_name: attr_name for attr_name in cls.__prodict_fields__}
+        cls.__prodict_custom_set_attribute__ = _overrides_set_attribute(cls)
+        if cls.__prodict_frozen__:
+            _check_frozen_fields(cls)
+        _install_field_properties(cls)
+        for subclass in cls.__subclasses__():
+            subclass.rebuild_fields()
+
+    def __init__(self_d921dfa9_4e93_4123_893d_a7e7eb783a32, *args, **kwargs):
+        _populate(self_d921dfa9_4e93_4123_893d_a7e7eb783a32, args, kwargs)
+
+    def init(self):
+        ...
+
+    def __new__(cls, *args, **kwargs):
+        return _allocate(cls)
+
+    def __reduce_ex__(self, protocol):
+        # The values are already converted, so they are restored as they are,
+        # without going through __init__. The class is kept as it is.
+        # Frozen and tracking instances are restored without their '__setitem__'.
+        if self.__prodict_frozen__ or self.__prodict_tracking__:
+            return copyreg.__newobj__, (type(self),), self.__getstate__()
+        # Items are set by the unpickler itself, which is faster than __setstate__
+        if self.__prodict_lazy__:
+            _resolve_all(self)
+        return copyreg.__newobj__, (type(self),), None, None, iter(dict.items(self))
+
+    def __getstate__(self):
+        if self.__prodict_lazy__:
+            _resolve_all(self)
+        return dict(self)
+
+    def __setstate__(self, state):
+        dict.update(self, state)
+
+    def copy(self):
+        """
+        Returns a shallow copy, of the same class.
+        """
+        cls = type(self)
+        new = cls.__new__(cls)
+        dict.update(new, self)
+        for name, value in self.__dict__.items():
+            new.__dict__[name] = copy.copy(value)
+        return new
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo=None):
+        # Values are already converted, so they are copied as they are.
+        # Immutable values are shared instead of copied.
+        if memo is None:
+            memo = {}
+        cls = type(self)
+        new = cls.__new__(cls)
+        memo[id(self)] = new
+        deepcopy = copy.deepcopy
+        immutable_types = _SCALAR_TYPES
+        for key, value in self.items():
+            if type(value) not in immutable_types and not _is_immutable_tuple(value):
+                value = deepcopy(value, memo)
+            dict.__setitem__(new, key, value)
+        for name, value in self.__dict__.items():
+            new.__dict__[name] = deepcopy(value, memo)
+        return new
+
+    @classmethod
+    def from_dict(cls, d: dict, validate=False):
+        """
+        :param d: dict
+        :param validate: If True, values that can't be converted don't stop
+            the conversion, and a ValidationError with all of them is raised at the end
+        """
+        if validate:
+            return _validate_rows(cls, [d], single=True)
+        if (cls.__init__ is not Prodict.__init__ or cls.__new__ is not Prodict.__new__
+                or cls.__prodict_custom_set_attribute__):
+            return cls(**d)
+        if cls.__prodict_codegen__ and _generated(cls).build is not None:
+            return _generated(cls).build(d)
+        instance = _allocate(cls)
+        _populate(instance, (), d)
+        return instance
+
+    @classmethod
+    def from_dicts(cls, rows, validate=False, workers=None) -> list:
+        """
+        Builds a list of instances from an iterable of dicts.
+        :param rows: Iterable of dicts
+        :param validate: Same as in 'from_dict', error paths start with the row index
+        :param workers: Number of processes to convert in, batches smaller than
+            PARALLEL_THRESHOLD are converted in the calling process.
+            The class must be importable by name.
+        :return: list
+        """
+        if workers is not None:
+            return _from_dicts_parallel(cls, rows, validate, workers)
+        if validate:
+            return _validate_rows(cls, rows)
+        build = _row_builder(cls)
+        return [build(row) for row in rows]
+
+    @classmethod
+    def from_converted(cls, values):
+        """
+        Builds an instance from values that are already converted.
+        The 'init' method is called, but values are not converted again.
+        """
+        instance = _allocate(cls)
+        if cls.init is not Prodict.init:
+            dict.update(instance, dict.fromkeys(cls.__prodict_fields__))
+            _run_init(instance)
+        _update_interned(instance, values)
+        for attr_name in cls.__prodict_fields__:
+            if attr_name not in instance:
+                dict.__setitem__(instance, attr_name, None)
+        if cls.__prodict_frozen__:
+            _freeze_values(instance, dict.keys(instance))
+        return instance
+
+    @classmethod
+    def iter_from_dicts(cls, rows):
+        """
+        Lazily builds instances from an iterable of dicts, one row at a time.
+        Suitable for streaming sources since rows are not held in memory.
+        :param rows: Iterable of dicts
+        :return: Iterator of instances
+        """
+        return map(_row_builder(cls), rows)
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Decodes a JSON document into an instance, or into a list of instances
+        if the document is an array.
+        :param data: JSON as str or bytes
+        """
+        decoded = _json_loads(data)
+        if isinstance(decoded, list):
+            return cls.from_dicts(decoded)
+        return cls.from_dict(decoded)
+
+    @classmethod
+    def make_model(cls, name: str, fields, **class_kwargs):
+        """
+        Builds a subclass with the given annotations. Classes are cached, so
+        the same arguments return the same class, see MODEL_CACHE_SIZE.
+        :param name: Class name
+        :param fields: Dict of attribute names to types
+        :param class_kwargs: Class keywords, like lazy=True
+        :return: Subclass of cls
+        """
+        return _make_model(cls, name, fields, class_kwargs)
+
+    @classmethod
+    def model_from_schema(cls, schema: dict, name='Model', **class_kwargs):
+        """
+        Builds a subclass from a JSON Schema of an object. Properties that are
+        objects with properties become nested models, arrays become lists and
+        'anyOf', 'oneOf' and lists of types become unions.
+        Classes are cached by the content of the schema, like in 'make_model'.
+        :param schema: JSON Schema as a dict
+        :param name: Class name, if the schema has no 'title'
+        :param class_kwargs: Class keywords, like lazy=True
+        :return: Subclass of cls
+        """
+        return _model_from_schema(cls, schema, name, class_kwargs)
+
+    @classmethod
+    def generated_source(cls) -> str:
+        """
+        Returns the source of the functions generated for a class defined
+        with 'codegen=True', for debugging.
+        """
+        if not cls.__prodict_codegen__:
+            raise TypeError('{} is not defined with codegen=True'.format(cls.__name__))
+        return _generated(cls).source
+
+    @classmethod
+    def to_dicts(cls, models, workers=None, **kwargs) -> list:
+        """
+        Returns the instances as a list of plain dicts.
+        :param models: Iterable of instances
+        :param workers: Same as in 'from_dicts', the classes of the instances must be importable
+        :param kwargs: Passed to 'to_dict', like is_recursive and exclude_none
+        :return: list
+        """
+        return _to_dicts(models, workers, kwargs)
+
+    @classmethod
+    async def afrom_dict(cls, d: dict, executor=None, chunk_size=ASYNC_CHUNK_SIZE):
+        """
+        Converts d like 'from_dict', but lets the event loop run other tasks
+        between chunks of 'List[Model]' values, at any depth.
+        :param d: dict
+        :param executor: Thread or process pool to convert the chunks in,
+            the models must be importable by name for a process pool
+        :param chunk_size: Number of list items converted at once
+        """
+        return await _afrom_dict(cls, d, chunk_size, executor)
+
+    @classmethod
+    def aread_jsonl(cls, stream, batch_size=None, executor=None):
+        """
+        Reads JSON Lines from an async stream, see the module level 'aread_jsonl'.
+        :param stream: Async iterable of bytes
+        :param batch_size: Yield lists of up to this many instances instead of single instances
+        :param executor: Thread or process pool to decode the batches in
+        :return: Async iterator
+        """
+        return aread_jsonl(cls, stream, batch_size, executor)
+
+    @classmethod
+    def read_jsonl(cls, source, batch_size=None, validate=False):
+        """
+        Reads a JSON Lines file, see the module level 'read_jsonl'.
+        :param source: Path or file object
+        :param batch_size: Yield lists of up to this many instances instead of single instances
+        :return: Iterator
+        """
+        return read_jsonl(cls, source, batch_size, validate)
+
+    @classmethod
+    def attr_has_default_value(cls, attr_name: str) -> bool:
+        value = getattr(cls, attr_name, _MISSING)
+        return value is not _MISSING and not isinstance(value, _FieldProperty)
+
+    @classmethod
+    def get_attr_default_value(cls, attr_name: str):
+        if cls.attr_has_default_value(attr_name):
+            return getattr(cls, attr_name)
+        else:
+            return None
+
+    @classmethod
+    def attr_type(cls, attr_name: str):
+        return cls.attr_types()[attr_name]
+
+    @classmethod
+    def attr_types(cls):
+        """
+        Returns annotated attribute types, including the inherited ones
+        :return: Dict[str, type]
+        """
+        return cls.__prodict_types__
+
+    @classmethod
+    def attr_names(cls) -> List[str]:
+        """
+        Returns annotated attribute names
+        :return: List[str]
+        """
+        return [k for k, v in cls.attr_types().items()]
+
+    @classmethod
+    def has_attr(cls, attr_name: str):
+        """
+        Returns True if class have an annotated attribute
+        :param attr_name: Attribute name
+        :return: bool
+        """
+        return attr_name in cls.__prodict_fields__
+
+    def set_default(self, attr_name):
+        if self.attr_has_default_value(attr_name):
+            self.set_attribute(attr_name, self.get_attr_default_value(attr_name))
+
+    def get_constructor(self, attr_name, value):
+        """
+        This method is used for type conversion.
+        Prodict uses this method to get the type of a value, then based on the
+        value, it return a constructor. If the type of a value is 'float' then
+        it returns 'float' since 'float' is also a constructor to build a float
+        value.
+        Assignments no longer call this method, they use the converters compiled
+        by 'rebuild_fields'. It is kept for backward compatibility.
+        """
+        attr_type1 = self.attr_type(attr_name)
+        constructor = None
+        element_type = None
+        if attr_type1 == float:
+            constructor = float
+        elif attr_type1 == str:
+            constructor = str
+        elif attr_type1 == int:
+            constructor = int
+        elif attr_type1 == list:
+            constructor = list
+        elif isinstance(value, Prodict):
+            constructor = attr_type1.from_dict
+        elif attr_type1 is Any:
+            constructor = None
+        elif isinstance(value, dict):
+            if attr_type1 == dict:
+                constructor = Prodict.from_dict
+            elif issubclass(attr_type1, Prodict):
+                constructor = self.attr_type(attr_name).from_dict
+        elif attr_type1 is List:
+            constructor = list
+        elif hasattr(attr_type1, '__origin__'):
+            if attr_type1.__dict__['__origin__'] is list:
+                # if the type is 'List[something]'
+                if len(attr_type1.__args__) == 0:
+                    constructor = list
+                elif len(attr_type1.__args__) == 1:
+                    constructor = List
+                    element_type = attr_type1.__args__[0]
+                elif len(attr_type1.__args__) > 1:
+                    raise TypeError('Only one dimensional List is supported')
+            elif attr_type1.__dict__['__origin__'] is tuple:
+                # if the type is 'Tuple[something]'
+                constructor = tuple
+
+        # print('constru={} element_type={}'.format(constructor, element_type))
+        return constructor, element_type
+
+    def set_attribute(self, attr_name, value):
+        if attr_name in DICT_RESERVED_KEYS:
+            raise TypeError("You cannot set a reserved name as attribute")
+        fields = self.__prodict_fields__
+        if attr_name in fields:
+            attr_name = self.__prodict_keys__[attr_name]
+            converter = fields[attr_name]
+            if value is not None and converter is not None:
+                value = converter(value)
+        elif isinstance(value, dict):
+            value = _to_prodict(value)
+        dict.__setitem__(self, attr_name, value)
+
+    def set_attributes(self_d921dfa9_4e93_4123_893d_a7e7eb783a32, **d):
+        for k, v in d.items():
+            self_d921dfa9_4e93_4123_893d_a7e7eb783a32.set_attribute(k, v)
+
+    def __getattr__(self, item):
+        # Only called for keys that are not annotated, see _FieldProperty
+        if item in self:
+            return self[item]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {item!r}")
+
+    def __setattr__(self, name: str, value) -> None:
+        self.set_attribute(name, value)
+
+    def to_dict(
+        self,
+        *args,
+        is_recursive=False,
+        exclude_none=False,
+        exclude_none_in_lists=False,
+        **kwargs
+    ):
+        """
+        Returns the instance as a plain dict.
+        :param is_recursive: Convert nested Prodicts, including the ones in lists,
+            tuples and dicts, at any depth
+        :param exclude_none: Exclude keys with None values
+        :param exclude_none_in_lists: Exclude keys with None values from Prodicts in lists
+        :return: dict
+        """
+        if is_recursive:
+            if self.__prodict_codegen__ and not exclude_none and not exclude_none_in_lists:
+                dump = _generated(type(self)).dump
+                if dump is not None:
+                    return dump(self)
+            return _dict_tree(self, exclude_none, exclude_none_in_lists)
+        if not exclude_none and not exclude_none_in_lists:
+            if self.__prodict_lazy__:
+                _resolve_all(self)
+            return dict(self)
+        return _shallow_dict(self.items(), exclude_none, exclude_none_in_lists)
+
+    def to_json(self, exclude_none=False, exclude_none_in_lists=False, default=None) -> str:
+        """
+        Encodes the instance as JSON. Nested Prodicts are encoded directly
+        without being copied into plain dicts first, unless None values are excluded.
+        :param exclude_none: Same as in 'to_dict'
+        :param exclude_none_in_lists: Same as in 'to_dict'
+        :param default: Called for values that can't be encoded, like in 'json.dumps'
+        :return: str
+        """
+        obj = self
+        if exclude_none or exclude_none_in_lists or self.__prodict_lazy__:
+            obj = _dict_tree(self, exclude_none, exclude_none_in_lists)
+        return _json_dumps(obj, default)
+
+
+def _freeze(value):
+    """
+    Returns an immutable equivalent of value: lists, tuples and sets of frozen
+    items, and FrozenProdict for plain dicts and Prodicts. Models are kept as
+    they are, frozen classes only accept FrozenProdict subclasses as annotations.
+    """
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES or isinstance(value, FrozenProdict):
+        return value
+    if value_type is dict or value_type is Prodict:
+        return FrozenProdict.from_dict(value)
+    if value_type is list or value_type is tuple:
+        items = tuple(_freeze(item) for item in value)
+        if value_type is tuple and all(map(operator.is_, items, value)):
+            return value
+        return items
+    if value_type is set:
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+def _mutable_model(attr_type):
+    # The first model class in an annotation that is not frozen, like Ram in 'Optional[List[Ram]]'
+    if _is_model(attr_type):
+        return None if issubclass(attr_type, FrozenProdict) else attr_type
+    for arg in getattr(attr_type, '__args__', None) or ():
+        model = _mutable_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+def _check_frozen_fields(cls):
+    # Mutable models are not hashable, so they can't be fields of a frozen class
+    for attr_name, attr_type in cls.__prodict_types__.items():
+        model = _mutable_model(attr_type)
+        if model is not None:
+            raise TypeError('{!r} of frozen class {!r} is annotated with the mutable model {!r}, '
+                            'annotate it with a FrozenProdict subclass'
+                            .format(attr_name, cls.__name__, model.__name__))
+
+
+def _freeze_values(instance, keys):
+    for key in keys:
+        value = dict.__getitem__(instance, key)
+        frozen = _freeze(value)
+        if frozen is not value:
+            dict.__setitem__(instance, key, frozen)
+
+
+class FrozenProdict(Prodict):
+    """
+    Immutable and hashable Prodict, to be used as a dict key or a set member.
+    Nested dicts become FrozenProdicts, lists become tuples and sets become
+    frozensets. The hash is computed once, when it is first needed.
+    Instances can only be changed in the 'init' method. Use 'evolve' to get
+    a changed copy. Fields annotated with models must use FrozenProdict subclasses.
+    """
+    __prodict_frozen__ = True
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('{!r} object is frozen'.format(type(self).__name__))
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    update = pop = popitem = clear = setdefault = _readonly
+
+    def set_attribute(self, attr_name, value):
+        if '__prodict_initializing__' not in self.__dict__:
+            self._readonly()
+        super().set_attribute(attr_name, value)
+
+    def __hash__(self):
+        instance_dict = self.__dict__
+        if '__prodict_hash__' not in instance_dict:
+            instance_dict['__prodict_hash__'] = hash(frozenset(dict.items(self)))
+        return instance_dict['__prodict_hash__']
+
+    @classmethod
+    def from_dict(cls, d: dict, validate=False):
+        # Instances are immutable, so they are shared instead of copied
+        if type(d) is cls:
+            return d
+        return super().from_dict(d, validate=validate)
+
+    def copy(self):
+        return self
+
+    def evolve(self, **changes):
+        """
+        Returns a new instance with the changed attributes. Unchanged values
+        are shared with this instance, and they are not converted again.
+        """
+        cls = type(self)
+        new = cls.__new__(cls)
+        dict.update(new, self)
+        _set_values(new, cls.__prodict_fields__, changes)
+        _freeze_values(new, changes)
+        return new
+
+
+def _merged_annotations(bases, namespace):
+    annotations = {}
+    for base in reversed(bases):
+        annotations.update(getattr(base, '__prodict_types__', {}))
+    annotations.update(namespace.get('__annotations__', {}))
+    return annotations
+
+
+class _CompactMeta(type):
+    """
+    Stores the annotated attributes of compact classes in __slots__.
+    Default values are moved from the class into __prodict_defaults__ since
+    a slot can't have a class attribute with the same name.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        inherited = _merged_annotations(bases, {})
+        annotations = _merged_annotations(bases, namespace)
+        defaults = {}
+        for base in reversed(bases):
+            defaults.update(getattr(base, '__prodict_defaults__', {}))
+        slots = list(namespace.get('__slots__', ()))
+        for attr_name in annotations:
+            if attr_name in namespace:
+                defaults[attr_name] = namespace.pop(attr_name)
+            if attr_name not in inherited:
+                slots.append(attr_name)
+        namespace['__slots__'] = tuple(slots)
+        namespace['__prodict_types__'] = annotations
+        namespace['__prodict_defaults__'] = defaults
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+# Number of keys that are not annotated a CompactProdict class keeps in its
+# shared layout, instances that add more keys get their own dict
+_SHARED_KEYS_MAX = 30
+_layout_lock = threading.Lock()
+
+
+def _extra_index(cls, key):
+    """
+    Returns the index of a key that is not annotated in the shared layout of
+    cls, adding it to the layout, or None if the layout is full.
+    Like the key-sharing instance dicts of CPython, the key strings are stored
+    once per class, and every instance only stores a list of the values.
+    """
+    index = cls.__prodict_extra_keys__.get(key)
+    if index is None:
+        with _layout_lock:
+            layout = cls.__prodict_extra_keys__
+            index = layout.get(key)
+            if index is None:
+                if len(layout) >= _SHARED_KEYS_MAX:
+                    return None
+                index = layout[key] = len(layout)
+                cls.__prodict_extra_names__ += (key,)
+    return index
+
+
+def _extra_get(instance, key):
+    extra = instance.__prodict_extra__
+    if extra is None:
+        return _MISSING
+    if type(extra) is dict:
+        return extra.get(key, _MISSING)
+    index = type(instance).__prodict_extra_keys__.get(key)
+    if index is None or index >= len(extra):
+        return _MISSING
+    return extra[index]
+
+
+def _extra_set(instance, key, value):
+    extra = instance.__prodict_extra__
+    if type(extra) is dict:
+        extra[key] = value
+        return
+    index = _extra_index(type(instance), key)
+    if index is None:
+        extra = dict(_extra_items(instance))
+        extra[key] = value
+        object.__setattr__(instance, '__prodict_extra__', extra)
+        return
+    if extra is None:
+        extra = []
+        object.__setattr__(instance, '__prodict_extra__', extra)
+    if index >= len(extra):
+        extra.extend([_MISSING] * (index + 1 - len(extra)))
+    extra[index] = value
+
+
+def _extra_del(instance, key):
+    # Returns False if the instance doesn't have the key
+    extra = instance.__prodict_extra__
+    if type(extra) is dict:
+        if key not in extra:
+            return False
+        del extra[key]
+        return True
+    if _extra_get(instance, key) is _MISSING:
+        return False
+    extra[type(instance).__prodict_extra_keys__[key]] = _MISSING
+    return True
+
+
+def _extra_items(instance):
+    extra = instance.__prodict_extra__
+    if not extra:
+        return ()
+    if type(extra) is dict:
+        return list(extra.items())
+    return [(key, value) for key, value in zip(type(instance).__prodict_extra_names__, extra)
+            if value is not _MISSING]
+
+
+def _populate_compact(instance, args, values):
+    cls = type(instance)
+    setters = cls.__prodict_setters__
+    for attr_name, default in cls.__prodict_defaults_all__:
+        if type(default) not in _SCALAR_TYPES:
+            default = copy.copy(default)
+        setters[attr_name](instance, default)
+    object.__setattr__(instance, '__prodict_extra__', None)
+    if args:
+        values = dict(*args, **values)
+    if cls.init is not CompactProdict.init:
+        instance.init()
+    fields = cls.__prodict_fields__
+    for attr_name, value in values.items():
+        if attr_name in fields:
+            converter = fields[attr_name]
+            if value is not None and converter is not None:
+                value = converter(value)
+            setters[attr_name](instance, value)
+        else:
+            instance.set_attribute(attr_name, value)
+
+
+class CompactProdict(metaclass=_CompactMeta):
+    """
+    A Prodict that is not a dict. Annotated attributes are stored in __slots__,
+    other keys are stored in a list of values created when it is first needed,
+    with the keys in a layout shared by the instances of the class. Those keys
+    are listed in the order the class first saw them.
+    Instances use a fraction of the memory of a Prodict, which matters for
+    caches of many instances of the same model.
+
+    It has attribute and item access, the read methods of dict, and the
+    'from_dict', 'from_dicts', 'to_dict', 'to_json' and pickle support of Prodict.
+    Missing annotated attributes get their class level default value, or None.
+    """
+    __slots__ = ('__prodict_extra__',)
+    __prodict_fields__ = {}
+    __prodict_setters__ = {}
+    __prodict_defaults_all__ = ()
+    __prodict_validators__ = None
+    # Shared layout of the keys that are not annotated: key to index, and the keys in order
+    __prodict_extra_keys__ = {}
+    __prodict_extra_names__ = ()
+    __hash__ = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.__prodict_extra_keys__ = {}
+        cls.__prodict_extra_names__ = ()
+        cls.__prodict_setters__ = {
+            attr_name: getattr(cls, attr_name).__set__ for attr_name in cls.__prodict_types__
+        }
+        cls.rebuild_fields()
+
+    @classmethod
+    def rebuild_fields(cls):
+        """
+        Compiles the annotations of the class into converters.
+        """
+        cls.__prodict_validators__ = None
+        cls.__prodict_fields__ = {
+            attr_name: _compile_converter(attr_type)
+            for attr_name, attr_type in cls.attr_types().items()
+        }
+        cls.__prodict_defaults_all__ = tuple(
+            (attr_name, cls.__prodict_defaults__.get(attr_name)) for attr_name in cls.__prodict_fields__
+        )
+
+    def __init__(self, *args, **kwargs):
+        _populate_compact(self, args, kwargs)
+
+    def init(self):
+        ...
+
+    @classmethod
+    def from_dict(cls, d: dict, validate=False):
+        if validate:
+            return _validate_rows(cls, [d], single=True)
+        if cls.__init__ is not CompactProdict.__init__:
+            return cls(**d)
+        instance = cls.__new__(cls)
+        _populate_compact(instance, (), d)
+        return instance
+
+    @classmethod
+    def from_dicts(cls, rows, validate=False, workers=None) -> list:
+        if workers is not None:
+            return _from_dicts_parallel(cls, rows, validate, workers)
+        if validate:
+            return _validate_rows(cls, rows)
+        from_dict = cls.from_dict
+        return [from_dict(row) for row in rows]
+
+    @classmethod
+    def from_converted(cls, values):
+        instance = cls.__new__(cls)
+        _populate_compact(instance, (), {})
+        for k, v in values.items():
+            instance[k] = v
+        return instance
+
+    @classmethod
+    def iter_from_dicts(cls, rows):
+        return map(cls.from_dict, rows)
+
+    @classmethod
+    def from_json(cls, data):
+        decoded = _json_loads(data)
+        if isinstance(decoded, list):
+            return cls.from_dicts(decoded)
+        return cls.from_dict(decoded)
+
+    @classmethod
+    def to_dicts(cls, models, workers=None, **kwargs) -> list:
+        return _to_dicts(models, workers, kwargs)
+
+    @classmethod
+    def make_model(cls, name: str, fields, **class_kwargs):
+        return _make_model(cls, name, fields, class_kwargs)
+
+    @classmethod
+    def model_from_schema(cls, schema: dict, name='Model', **class_kwargs):
+        return _model_from_schema(cls, schema, name, class_kwargs)
+
+    @classmethod
+    def read_jsonl(cls, source, batch_size=None, validate=False):
+        return read_jsonl(cls, source, batch_size, validate)
+
+    @classmethod
+    async def afrom_dict(cls, d: dict, executor=None, chunk_size=ASYNC_CHUNK_SIZE):
+        return await _run_chunk(executor, cls.from_dict, d)
+
+    @classmethod
+    def aread_jsonl(cls, stream, batch_size=None, executor=None):
+        return aread_jsonl(cls, stream, batch_size, executor)
+
+    @classmethod
+    def attr_types(cls):
+        return cls.__prodict_types__
+
+    @classmethod
+    def attr_type(cls, attr_name: str):
+        return cls.attr_types()[attr_name]
+
+    @classmethod
+    def attr_names(cls) -> List[str]:
+        return list(cls.attr_types())
+
+    @classmethod
+    def has_attr(cls, attr_name: str):
+        return attr_name in cls.__prodict_fields__
+
+    @classmethod
+    def attr_has_default_value(cls, attr_name: str) -> bool:
+        return attr_name in cls.__prodict_defaults__
+
+    @classmethod
+    def get_attr_default_value(cls, attr_name: str):
+        return cls.__prodict_defaults__.get(attr_name)
+
+    def set_attribute(self, attr_name, value):
+        fields = self.__prodict_fields__
+        if attr_name in fields:
+            converter = fields[attr_name]
+            if value is not None and converter is not None:
+                value = converter(value)
+            self.__prodict_setters__[attr_name](self, value)
+            return
+        if attr_name in DICT_RESERVED_KEYS:
+            raise TypeError("You cannot set a reserved name as attribute")
+        if isinstance(value, dict):
+            value = _to_prodict(value)
+        self[attr_name] = value
+
+    def set_attributes(self, **d):
+        for k, v in d.items():
+            self.set_attribute(k, v)
+
+    def __setattr__(self, name: str, value) -> None:
+        self.set_attribute(name, value)
+
+    def __getattr__(self, item):
+        # Only called for keys that are not annotated, or deleted annotated keys
+        if item != '__prodict_extra__':
+            value = _extra_get(self, item)
+            if value is not _MISSING:
+                return value
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {item!r}")
+
+    def __getitem__(self, key):
+        if key in self.__prodict_fields__:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        else:
+            value = _extra_get(self, key)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.__prodict_fields__:
+            self.__prodict_setters__[key](self, value)
+        else:
+            _extra_set(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self.__prodict_fields__ and getattr(self, key, _MISSING) is not _MISSING:
+            object.__delattr__(self, key)
+        elif not _extra_del(self, key):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        for attr_name in self.__prodict_fields__:
+            value = getattr(self, attr_name, _MISSING)
+            if value is not _MISSING:
+                yield attr_name, value
+        yield from _extra_items(self)
+
+    def keys(self):
+        return [k for k, v in self.items()]
+
+    def values(self):
+        return [v for k, v in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, CompactProdict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, dict(self.items()))
+
+    def copy(self):
+        cls = type(self)
+        new = cls.__new__(cls)
+        new.__setstate__(self.__getstate__())
+        return new
+
+    def __copy__(self):
+        return self.copy()
+
+    def __reduce_ex__(self, protocol):
+        return copyreg.__newobj__, (type(self),), self.__getstate__()
+
+    def __getstate__(self):
+        return dict(self.items())
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '__prodict_extra__', None)
+        for k, v in state.items():
+            self[k] = v
+
+    def to_dict(self, *args, is_recursive=False, exclude_none=False, exclude_none_in_lists=False, **kwargs):
+        """
+        Returns the instance as a plain dict, see 'Prodict.to_dict'.
+        """
+        if is_recursive:
+            return _dict_tree(self, exclude_none, exclude_none_in_lists)
+        return _shallow_dict(self.items(), exclude_none, exclude_none_in_lists)
+
+    def to_json(self, exclude_none=False, exclude_none_in_lists=False, default=None) -> str:
+        return _json_dumps(_dict_tree(self, exclude_none, exclude_none_in_lists), default)
+
+
+def _is_plain_mapping(attr_type):
+    """
+    Tells whether attr_type is 'dict', 'Dict' or a 'Dict[K, V]' whose keys and
+    values are stored as they are, so a view of Prodict reads it the same way.
+    """
+    if attr_type is dict or attr_type is Dict:
+        return True
+    if getattr(attr_type, '__origin__', None) is not dict:
+        return False
+    args = getattr(attr_type, '__args__', None) or ()
+    return len(args) != 2 or (args[0] in (str, Any) and args[1] in (Any, dict, Dict))
+
+
+def _view_value(model, key, value):
+    """
+    Converts a value read through a view with the field plan of model.
+    Nested models, lists of models and dicts are wrapped in views instead of being copied.
+    """
+    fields = model.__prodict_fields__
+    if key not in fields:
+        return ProdictView(Prodict, value) if type(value) is dict else value
+    converter = fields[key]
+    if converter is None:
+        return value
+    attr_type = model.__prodict_types__[key]
+    if type(value) is dict and _is_plain_mapping(attr_type):
+        return ProdictView(Prodict, value)
+    field_model, is_list = _field_model(attr_type)
+    if field_model is not None:
+        if is_list and type(value) is list:
+            return _ListView(field_model, value)
+        if not is_list and type(value) is dict:
+            return ProdictView(field_model, value)
+    return converter(value)
+
+
+class ProdictView:
+    """
+    Wraps an existing dict without copying it, see 'view'.
+    Values are converted with the annotations of the model when they are read,
+    nested dicts and lists of models are wrapped in views too.
+    The first write copies the wrapped dict, which is never changed.
+    """
+    __slots__ = ('_view_model', '_view_data', '_view_cache', '_view_copied')
+
+    def __init__(self, model, data: dict):
+        object.__setattr__(self, '_view_model', model)
+        object.__setattr__(self, '_view_data', data)
+        # Converted values and nested views by key
+        object.__setattr__(self, '_view_cache', {})
+        object.__setattr__(self, '_view_copied', False)
+
+    def __getitem__(self, key):
+        cache = self._view_cache
+        if key in cache:
+            return cache[key]
+        data = self._view_data
+        if key not in data:
+            if key in self._view_model.__prodict_fields__:
+                return None
+            raise KeyError(key)
+        value = data[key]
+        if value is not None:
+            value = _view_value(self._view_model, key, value)
+        cache[key] = value
+        return value
+
+    def __getattr__(self, item):
+        # The slots are not set yet in a copy that is being restored
+        if item in ProdictView.__slots__ or (item[:2] == '__' and item[-2:] == '__'):
+            raise AttributeError(item)
+        if item in self._view_data or item in self._view_model.__prodict_fields__:
+            return self[item]
+        raise AttributeError(f"{self._view_model.__name__!r} view has no attribute {item!r}")
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __contains__(self, key):
+        return key in self._view_data or key in self._view_model.__prodict_fields__
+
+    def keys(self):
+        data = self._view_data
+        return list(data) + [key for key in self._view_model.__prodict_fields__ if key not in data]
+
+    def __iter__(self):
+        return iter(self.keys())
 
-class GenericMeta(type):
-    pass
+    def __len__(self):
+        return len(self.keys())
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
 
+    def __setitem__(self, key, value):
+        model = self._view_model
+        if getattr(model, '__prodict_frozen__', False):
+            raise TypeError('{!r} object is frozen'.format(model.__name__))
+        if key in DICT_RESERVED_KEYS:
+            raise TypeError("You cannot set a reserved name as attribute")
+        fields = model.__prodict_fields__
+        if key in fields:
+            converter = fields[key]
+            if value is not None and converter is not None:
+                value = converter(value)
+        elif isinstance(value, dict):
+            value = _to_prodict(value)
+        self._own()[key] = value
+        self._view_cache.pop(key, None)
 
-def _dict_value(v, is_recursive, exclude_none, exclude_none_in_lists):
-    if is_recursive and isinstance(v, Prodict):
-        return v.to_dict(is_recursive=is_recursive, exclude_none=exclude_none)
-    if exclude_none_in_lists and isinstance(v, List):
-        return [
-            item.to_dict(exclude_none=True, is_recursive=is_recursive)
-            if isinstance(item, Prodict)
-            else item
-            for item in v
-        ]
-    return v
+    def __setattr__(self, name, value):
+        self[name] = value
 
+    def __delitem__(self, key):
+        if getattr(self._view_model, '__prodict_frozen__', False):
+            raise TypeError('{!r} object is frozen'.format(self._view_model.__name__))
+        del self._own()[key]
+        self._view_cache.pop(key, None)
 
-def _none_condition(v, is_recursive, exclude_none):
-    return v is not None if exclude_none else True
+    def _own(self):
+        if not self._view_copied:
+            object.__setattr__(self, '_view_data', dict(self._view_data))
+            object.__setattr__(self, '_view_copied', True)
+        return self._view_data
 
+    def _view_written(self):
+        return self._view_copied or any(
+            isinstance(value, (ProdictView, _ListView)) and value._view_written()
+            for value in self._view_cache.values()
+        )
 
-# noinspection PyMethodParameters
-class Prodict(dict):
+    def to_dict(self) -> dict:
+        """
+        Returns the wrapped dict itself if nothing was written through the view
+        or the nested views. Otherwise returns a copy with the writes applied,
+        which shares the parts that were not written with the wrapped dict.
+        """
+        changed = {
+            key: value.to_dict() if isinstance(value, ProdictView) else value.to_list()
+            for key, value in self._view_cache.items()
+            if isinstance(value, (ProdictView, _ListView)) and value._view_written()
+        }
+        if not changed and not self._view_copied:
+            return self._view_data
+        result = dict(self._view_data)
+        result.update(changed)
+        return result
+
+    def to_json(self, default=None) -> str:
+        return _json_dumps(self.to_dict(), default)
+
+    def to_model(self):
+        """
+        Converts the viewed data into an instance of the model.
+        """
+        return self._view_model.from_dict(self.to_dict())
+
+    def __reduce__(self):
+        # Copies and pickles wrap the data with the writes applied
+        return ProdictView, (self._view_model, self.to_dict())
+
+    def __eq__(self, other):
+        if isinstance(other, (ProdictView, _ListView)):
+            other = other.to_dict() if isinstance(other, ProdictView) else other.to_list()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'view({}, {!r})'.format(self._view_model.__name__, self.to_dict())
+
+
+class _ListView:
     """
-    Prodict = Dictionary with IDE friendly(auto code completion),
-    dot-accessible attributes and more.
+    Read-only sequence that wraps a list of dicts in views of a model as they are read.
     """
+    __slots__ = ('_view_model', '_view_data', '_view_cache')
 
-    def __init__(self_d921dfa9_4e93_4123_893d_a7e7eb783a32, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(self, model, data: list):
+        self._view_model = model
+        self._view_data = data
+        self._view_cache = {}
 
-        # #3: Set all properties to None
-        for (
-            k,
-            v,
-        ) in self_d921dfa9_4e93_4123_893d_a7e7eb783a32.attr_types().items():
-            self_d921dfa9_4e93_4123_893d_a7e7eb783a32.set_attribute(k, None)
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._view_data)))]
+        if index < 0:
+            index += len(self._view_data)
+        cache = self._view_cache
+        if index in cache:
+            return cache[index]
+        value = self._view_data[index]
+        if type(value) is dict:
+            value = cache[index] = ProdictView(self._view_model, value)
+        elif value is not None:
+            value = cache[index] = _prodict_converter(self._view_model)(value)
+        return value
 
-        # Set default values of annotated attributes
-        self_d921dfa9_4e93_4123_893d_a7e7eb783a32.init()
-        self_d921dfa9_4e93_4123_893d_a7e7eb783a32.set_attributes(**kwargs)
+    def __len__(self):
+        return len(self._view_data)
 
-    def init(self):
-        ...
+    def __iter__(self):
+        return (self[index] for index in range(len(self._view_data)))
 
-    def __new__(cls, *args, **kwargs):
-        return super(Prodict, cls).__new__(cls, *args, **kwargs)
+    def _view_written(self):
+        return any(isinstance(value, ProdictView) and value._view_written() for value in self._view_cache.values())
 
-    def __getstate__(self):
-        return self.to_dict()
+    def to_list(self) -> list:
+        """
+        Returns the wrapped list itself, or a copy if items were written through their views.
+        """
+        if not self._view_written():
+            return self._view_data
+        result = list(self._view_data)
+        for index, value in self._view_cache.items():
+            if isinstance(value, ProdictView) and value._view_written():
+                result[index] = value.to_dict()
+        return result
 
-    def __setstate__(self, state):
-        return Prodict.from_dict(state)
+    def __eq__(self, other):
+        if isinstance(other, _ListView):
+            other = other.to_list()
+        return self.to_list() == other
 
-    def __deepcopy__(self, memo=None):
-        new = self.from_dict({})
-        for key in self.keys():
-            new.set_attribute(key, copy.deepcopy(self[key], memo=memo))
-        return new
+    __hash__ = None
 
-    @classmethod
-    def from_dict(cls, d: dict):
-        return cls(**d)
+    def __repr__(self):
+        return 'view({!r})'.format(self._view_data)
 
-    @classmethod
-    def attr_has_default_value(cls, attr_name: str) -> bool:
-        return bool(hasattr(cls, attr_name))
 
-    @classmethod
-    def get_attr_default_value(cls, attr_name: str):
-        if cls.attr_has_default_value(attr_name):
-            return getattr(cls, attr_name)
-        else:
-            return None
+def view(model, d: dict) -> ProdictView:
+    """
+    Wraps d without copying it, for read access to large data.
+    Values are converted with the annotations of model when they are read, and
+    nested dicts and lists of models are wrapped the same way. Writes go to a
+    copy, 'to_dict' returns d itself if nothing was written.
+    Fields named like the methods of the view, like 'items' or 'keys', are read with '[]'.
+    :param model: Prodict or CompactProdict subclass
+    :param d: dict
+    :return: ProdictView
+    """
+    return ProdictView(model, d)
 
-    @classmethod
-    def attr_type(cls, attr_name: str):
-        return cls.attr_types()[attr_name]
 
-    @classmethod
-    def attr_types(cls):
-        return cls.__annotations__ if hasattr(cls, '__annotations__') else {}
+# array.array type codes of the annotated types stored in typed columns
+_COLUMN_TYPECODES = {int: 'q', float: 'd'}
+# Number of rows converted at once when a frame is built
+FRAME_CHUNK_SIZE = 100000
+
+_COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def _typed_column(typecode, values):
+    """
+    Returns values as an array of typecode, or None if they don't fit one,
+    like when there are None values.
+    """
+    try:
+        return array.array(typecode, values)
+    except (TypeError, OverflowError):
+        return None
+
+
+class ProdictFrame:
+    """
+    Columnar container of many records of the same model. Every annotated
+    attribute is stored as a column: an array.array for int and float
+    attributes, or a NumPy array if NumPy is installed, and a list otherwise.
+    Rows are turned into instances of the model only when they are accessed.
+    Keys that are not annotated are not stored.
+    """
+
+    def __init__(self, model, columns: dict, length: int):
+        """
+        :param model: Prodict or CompactProdict subclass
+        :param columns: Dict of attribute names to columns of the same length,
+            see 'from_dicts' to build one from records
+        :param length: Number of rows
+        """
+        self.model = model
+        self.columns = columns
+        self.length = length
 
     @classmethod
-    def attr_names(cls) -> List[str]:
+    def from_dicts(cls, model, rows, use_numpy=None) -> 'ProdictFrame':
         """
-        Returns annotated attribute names
-        :return: List[str]
+        Converts records with the annotations of model and stores them as columns.
+        Records are converted in chunks, so rows can be a generator.
+        Missing keys get the value 'from_dict' gives them: the default value of
+        a CompactProdict attribute, None otherwise.
+        :param model: Prodict or CompactProdict subclass
+        :param rows: Iterable of dicts
+        :param use_numpy: Store typed columns as NumPy arrays, by default if NumPy is installed
         """
-        return [k for k, v in cls.attr_types().items()]
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError('NumPy is not installed')
+        fields = model.__prodict_fields__
+        defaults = {name: model.get_attr_default_value(name) for name in fields} \
+            if issubclass(model, CompactProdict) else {}
+        columns = {
+            name: array.array(_COLUMN_TYPECODES[converter]) if converter in _COLUMN_TYPECODES else []
+            for name, converter in fields.items()
+        }
+        length = 0
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, FRAME_CHUNK_SIZE))
+            if not chunk:
+                break
+            length += len(chunk)
+            for name, converter in fields.items():
+                values = [row.get(name, _MISSING) for row in chunk]
+                if converter is not None:
+                    values = [value if value is None or value is _MISSING else converter(value) for value in values]
+                default = defaults.get(name)
+                if type(default) in _SCALAR_TYPES:
+                    values = [default if value is _MISSING else value for value in values]
+                else:
+                    # Like CompactProdict, every row gets its own copy of a mutable default
+                    values = [copy.copy(default) if value is _MISSING else value for value in values]
+                column = columns[name]
+                if type(column) is array.array:
+                    typed = _typed_column(column.typecode, values)
+                    if typed is None:
+                        column = columns[name] = column.tolist()
+                    else:
+                        column.extend(typed)
+                        continue
+                column.extend(values)
+        if use_numpy:
+            for name, column in columns.items():
+                if type(column) is array.array:
+                    columns[name] = numpy.frombuffer(column, dtype=column.typecode)
+        return cls(model, columns, length)
 
     @classmethod
-    def has_attr(cls, attr_name: str):
+    def from_models(cls, model, models, use_numpy=None) -> 'ProdictFrame':
         """
-        Returns True if class have an annotated attribute
-        :param attr_name: Attribute name
-        :return: bool
+        Stores instances of model as columns.
         """
-        return bool(cls.attr_types().get(attr_name))
+        return cls.from_dicts(model, (instance.to_dict() for instance in models), use_numpy)
 
-    def set_default(self, attr_name):
-        if self.attr_has_default_value(attr_name):
-            attr_default_type = self.attr_type(attr_name)
-            attr_default_value = self.get_attr_default_value(attr_name)
-            delattr(self, attr_name)
-            self.__annotations__[attr_name] = attr_default_type
-            self.set_attribute(attr_name, None)
-            self.update({attr_name: attr_default_value})
+    def __len__(self):
+        return self.length
 
-    def get_constructor(self, attr_name, value):
+    def __repr__(self):
+        return '{}({}, {} rows)'.format(type(self).__name__, self.model.__name__, self.length)
+
+    def column(self, name: str):
         """
-        This method is used for type conversion.
-        Prodict uses this method to get the type of a value, then based on the
-        value, it return a constructor. If the type of a value is 'float' then
-        it returns 'float' since 'float' is also a constructor to build a float
-        value.
+        Returns the column of an attribute, as it is stored.
         """
-        attr_type1 = self.attr_type(attr_name)
-        constructor = None
-        element_type = None
-        if attr_type1 == float:
-            constructor = float
-        elif attr_type1 == str:
-            constructor = str
-        elif attr_type1 == int:
-            constructor = int
-        elif attr_type1 == list:
-            constructor = list
-        elif isinstance(value, Prodict):
-            constructor = attr_type1.from_dict
-        elif attr_type1 is Any:
-            constructor = None
-        elif isinstance(value, dict):
-            if attr_type1 == dict:
-                constructor = Prodict.from_dict
-            elif issubclass(attr_type1, Prodict):
-                constructor = self.attr_type(attr_name).from_dict
-        elif attr_type1 is List:
-            constructor = list
-        elif hasattr(attr_type1, '__origin__'):
-            if attr_type1.__dict__['__origin__'] is list:
-                # if the type is 'List[something]'
-                if len(attr_type1.__args__) == 0:
-                    constructor = list
-                elif len(attr_type1.__args__) == 1:
-                    constructor = List
-                    element_type = attr_type1.__args__[0]
-                elif len(attr_type1.__args__) > 1:
-                    raise TypeError('Only one dimensional List is supported')
-            elif attr_type1.__dict__['__origin__'] is tuple:
-                # if the type is 'Tuple[something]'
-                constructor = tuple
+        return self.columns[name]
 
-        # print('constru={} element_type={}'.format(constructor, element_type))
-        return constructor, element_type
+    def _values(self, name):
+        # Column items as Python objects
+        column = self.columns[name]
+        return column.tolist() if numpy is not None and isinstance(column, numpy.ndarray) else column
 
-    def set_attribute(self, attr_name, value):
-        if attr_name in DICT_RESERVED_KEYS:
-            raise TypeError("You cannot set a reserved name as attribute")
-        if self.has_attr(attr_name):
-            if value is None:
-                self.update({attr_name: None})
-            elif self.attr_type(attr_name) == Any:
-                self[attr_name] = value
-            else:
-                constructor, element_type = self.get_constructor(
-                    attr_name, value
-                )
-                if constructor is None:
-                    self.update({attr_name: value})
-                elif constructor == List:
-                    value_list: List[element_type] = value
-                    new_list: List[element_type] = []
-
-                    if issubclass(element_type, Prodict):
-                        element_constructor = element_type.from_dict
-                    else:
-                        element_constructor = element_type
+    def row(self, index: int):
+        """
+        Returns the row at index as an instance of the model.
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('row index out of range')
+        values = {}
+        for name, column in self.columns.items():
+            value = column[index]
+            values[name] = value.item() if numpy is not None and isinstance(column, numpy.ndarray) else value
+        return self.model.from_converted(values)
 
-                    for v in value_list:
-                        new_list.append(element_constructor(v))
-                    self.update({attr_name: new_list})
-                elif constructor == list:
-                    self.update({attr_name: list(value)})
-                else:
-                    self.update({attr_name: constructor(value)})
+    def __getitem__(self, key):
+        """
+        frame['name'] returns a column, frame[3] a row and frame[10:20] a frame of the rows.
+        """
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, slice):
+            return type(self)(self.model, {name: column[key] for name, column in self.columns.items()},
+                              len(range(*key.indices(self.length))))
+        return self.row(key)
+
+    def rows(self):
+        """
+        Iterates over the rows as instances of the model, built one at a time.
+        """
+        names = list(self.columns)
+        from_converted = self.model.from_converted
+        for values in zip(*(self._values(name) for name in names)):
+            yield from_converted(dict(zip(names, values)))
+
+    def __iter__(self):
+        return self.rows()
+
+    def to_dicts(self) -> list:
+        """
+        Returns the rows as plain dicts.
+        """
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*(self._values(name) for name in names))]
+
+    def mask(self, name: str, op: str, value):
+        """
+        Compares every value of a column with value, vectorized with NumPy columns.
+        None values never match, except for '!='.
+        :param op: One of '==', '!=', '<', '<=', '>', '>=', or 'in' for a collection
+        :return: Sequence of bools
+        """
+        column = self.columns[name]
+        if op == 'in':
+            if numpy is not None and isinstance(column, numpy.ndarray):
+                return numpy.isin(column, list(value))
+            value = set(value)
+            return [item in value for item in column]
+        compare = _COMPARISONS[op]
+        if numpy is not None and isinstance(column, numpy.ndarray):
+            return compare(column, value)
+        if type(column) is list and op not in ('==', '!='):
+            return [item is not None and compare(item, value) for item in column]
+        return list(map(compare, column, itertools.repeat(value)))
+
+    def filter(self, mask) -> 'ProdictFrame':
+        """
+        Returns a frame of the rows where mask is true, see 'mask' and 'where'.
+        """
+        if numpy is not None and isinstance(mask, numpy.ndarray):
+            columns = {name: column[mask] if isinstance(column, numpy.ndarray)
+                       else list(itertools.compress(column, mask)) for name, column in self.columns.items()}
         else:
-            if isinstance(value, dict):
-                if isinstance(value, Prodict):
-                    constructor = value.from_dict
-                else:
-                    constructor = Prodict.from_dict
-                self.update({attr_name: constructor(value)})
-            else:
-                self.update({attr_name: value})
+            columns = {}
+            for name, column in self.columns.items():
+                selected = itertools.compress(column, mask)
+                columns[name] = (array.array(column.typecode, selected) if type(column) is array.array
+                                 else list(selected))
+            if numpy is not None:
+                for name, column in columns.items():
+                    if isinstance(self.columns[name], numpy.ndarray):
+                        columns[name] = numpy.asarray(column, dtype=self.columns[name].dtype)
+        return type(self)(self.model, columns, len(next(iter(columns.values()))) if columns else 0)
 
-    def set_attributes(self_d921dfa9_4e93_4123_893d_a7e7eb783a32, **d):
-        for k, v in d.items():
-            self_d921dfa9_4e93_4123_893d_a7e7eb783a32.set_attribute(k, v)
+    def where(self, name: str, op: str, value) -> 'ProdictFrame':
+        """
+        Returns a frame of the rows where the column compares true with value,
+        like frame.where('capacity', '>=', 8).
+        """
+        return self.filter(self.mask(name, op, value))
+
+    def _present(self, name):
+        column = self.columns[name]
+        if type(column) is list:
+            return [value for value in column if value is not None]
+        return column
+
+    def count(self, name: str) -> int:
+        """
+        Returns the number of values in a column that are not None.
+        """
+        return len(self._present(name))
+
+    def sum(self, name: str):
+        values = self._present(name)
+        return values.sum().item() if numpy is not None and isinstance(values, numpy.ndarray) else sum(values)
+
+    def mean(self, name: str):
+        values = self._present(name)
+        if not len(values):
+            return None
+        return self.sum(name) / len(values)
+
+    def min(self, name: str):
+        values = self._present(name)
+        if not len(values):
+            return None
+        return values.min().item() if numpy is not None and isinstance(values, numpy.ndarray) else min(values)
+
+    def max(self, name: str):
+        values = self._present(name)
+        if not len(values):
+            return None
+        return values.max().item() if numpy is not None and isinstance(values, numpy.ndarray) else max(values)
+
+
+# Number of classes kept by 'make_model' and 'model_from_schema', least recently used ones are dropped
+MODEL_CACHE_SIZE = 256
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+# Python types of JSON Schema types
+_SCHEMA_TYPES = {
+    'string': str,
+    'integer': int,
+    'number': float,
+    'boolean': bool,
+    'array': list,
+    'object': dict,
+    'null': type(None),
+}
+
+
+def _cached_model(key, build):
+    """
+    Returns the class cached under key, or builds and caches it.
+    Keys that can't be hashed are not cached.
+    """
+    try:
+        hash(key)
+    except TypeError:
+        return build()
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is not None:
+            _model_cache.move_to_end(key)
+            return model
+    model = build()
+    with _model_cache_lock:
+        model = _model_cache.setdefault(key, model)
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+    return model
+
+
+def _make_model(base, name, fields, class_kwargs):
+    fields = dict(fields)
+    key = ('fields', base, name, tuple(fields.items()), tuple(sorted(class_kwargs.items())))
+
+    def build():
+        return types.new_class(name, (base,), class_kwargs,
+                               lambda namespace: namespace.update(__annotations__=fields, __module__=base.__module__))
+
+    return _cached_model(key, build)
+
+
+def _schema_type(base, schema, name, class_kwargs):
+    """
+    Returns the annotation for a JSON Schema, with a model class for objects with properties.
+    """
+    if not isinstance(schema, dict):
+        return Any
+    for keyword in ('anyOf', 'oneOf'):
+        if keyword in schema:
+            members = tuple(_schema_type(base, member, name, class_kwargs) for member in schema[keyword])
+            return Any if Any in members else Union[members]
+    schema_type = schema.get('type')
+    if isinstance(schema_type, list):
+        members = tuple(_schema_type(base, dict(schema, type=member), name, class_kwargs)
+                        for member in schema_type)
+        return Union[members]
+    if schema_type == 'object' and 'properties' in schema:
+        return _model_from_schema(base, schema, name, class_kwargs)
+    if schema_type == 'array' and isinstance(schema.get('items'), dict):
+        return List[_schema_type(base, schema['items'], name + 'Item', class_kwargs)]
+    return _SCHEMA_TYPES.get(schema_type, Any)
+
+
+def _model_from_schema(base, schema, name, class_kwargs):
+    name = schema.get('title') or name
+    key = ('schema', base, name, json.dumps(schema, sort_keys=True, default=repr),
+           tuple(sorted(class_kwargs.items())))
+
+    def build():
+        fields = {
+            attr_name: _schema_type(base, attr_schema, attr_name[:1].upper() + attr_name[1:], class_kwargs)
+            for attr_name, attr_schema in schema.get('properties', {}).items()
+        }
+        return _make_model(base, name, fields, class_kwargs)
+
+    return _cached_model(key, build)
+
+
+# Counters by class while instrumentation is enabled, see 'enable_stats'.
+# Classes are held weakly, so that counting doesn't keep dynamic models alive.
+_stats = weakref.WeakKeyDictionary()
+# Original functions and methods replaced while instrumentation is enabled
+_uninstrumented = {}
+
+# Kinds of converters by the function that compiles them
+_CONVERTER_KINDS = {
+    '_prodict_converter': 'model',
+    '_items_converter': 'items',
+    '_tuple_converter': 'tuple',
+    '_dict_converter': 'dict',
+    '_union_converter': 'union',
+}
+
+
+def _converter_kind(converter):
+    if isinstance(converter, type):
+        return converter.__name__
+    if converter is _to_prodict:
+        return 'prodict'
+    return _CONVERTER_KINDS.get(converter.__qualname__.split('.')[0], 'other')
+
+
+def _class_stats(cls):
+    counters = _stats.get(cls)
+    if counters is None:
+        counters = _stats[cls] = {
+            'constructions': 0,
+            'conversions': {},
+            'to_dict': 0,
+            'to_dict_seconds': 0.0,
+            'to_json': 0,
+            'to_json_seconds': 0.0,
+            'getattr_misses': 0,
+            'deepcopies': 0,
+        }
+    return counters
+
+
+def _count_conversions(cls, fields, values):
+    conversions = _class_stats(cls)['conversions']
+    for attr_name, value in values.items():
+        if value is not None and fields.get(attr_name) is not None:
+            kind = _converter_kind(fields[attr_name])
+            conversions[kind] = conversions.get(kind, 0) + 1
+
+
+def _counting_allocate(cls):
+    _class_stats(cls)['constructions'] += 1
+    return dict.__new__(cls)
 
+
+def _counting_populate_compact(instance, args, values):
+    # Compact instances are built by '_populate_compact', or restored by '__setstate__'
+    cls = type(instance)
+    _class_stats(cls)['constructions'] += 1
+    _count_conversions(cls, cls.__prodict_fields__, values)
+    _uninstrumented['_populate_compact'](instance, args, values)
+
+
+def _counting_set_values(instance, fields, values):
+    _count_conversions(type(instance), fields, values)
+    _uninstrumented['_set_values'](instance, fields, values)
+
+
+def _counting_row_builder(cls):
+    # The optimized builders convert without '_set_values', so '_populate' is used for every row
+    build = _uninstrumented['_row_builder'](cls)
+    if build == cls.from_dict or not issubclass(cls, Prodict):
+        return build
+
+    def build_with_populate(row):
+        instance = _allocate(cls)
+        _populate(instance, (), row)
+        return instance
+
+    return build_with_populate
+
+
+def _counting_set_attribute(method):
+    def set_attribute(self, attr_name, value):
+        _count_conversions(type(self), self.__prodict_fields__, {attr_name: value})
+        return method(self, attr_name, value)
+
+    return set_attribute
+
+
+def _timed(method, name):
+    def timed(self, *args, **kwargs):
+        counters = _class_stats(type(self))
+        counters[name] += 1
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            counters[name + '_seconds'] += time.perf_counter() - started
+
+    return timed
+
+
+def _counting_setstate(method):
+    def __setstate__(self, state):
+        _class_stats(type(self))['constructions'] += 1
+        return method(self, state)
+
+    return __setstate__
+
+
+def _counting_getattr(method):
     def __getattr__(self, item):
         try:
-            return self[item]
-        except KeyError as exc:
-            raise AttributeError(f"{type(self).__name__!r} object has no attribute {exc!s}") from None
+            return method(self, item)
+        except AttributeError:
+            _class_stats(type(self))['getattr_misses'] += 1
+            raise
 
-    def __setattr__(self, name: str, value) -> None:
-        self.set_attribute(name, value)
+    return __getattr__
 
-    def to_dict(
-        self,
-        *args,
-        is_recursive=False,
-        exclude_none=False,
-        exclude_none_in_lists=False,
-        **kwargs
-    ):
-        ret = {
-            k: _dict_value(
-                v,
-                is_recursive=is_recursive,
-                exclude_none=exclude_none,
-                exclude_none_in_lists=exclude_none_in_lists,
-            )
-            for k, v in self.items()
-            if _none_condition(
-                v, is_recursive=is_recursive, exclude_none=exclude_none
-            )
-        }
-        return ret
+
+def _counting_deepcopy(method):
+    def __deepcopy__(self, memo=None):
+        _class_stats(type(self))['deepcopies'] += 1
+        return method(self, memo)
+
+    return __deepcopy__
+
+
+# (owner, name, function that returns the counting replacement of the original)
+_INSTRUMENTED = [
+    (None, '_allocate', lambda original: _counting_allocate),
+    (None, '_populate_compact', lambda original: _counting_populate_compact),
+    (None, '_set_values', lambda original: _counting_set_values),
+    (None, '_row_builder', lambda original: _counting_row_builder),
+    (Prodict, 'set_attribute', _counting_set_attribute),
+    (Prodict, 'to_dict', lambda original: _timed(original, 'to_dict')),
+    (Prodict, 'to_json', lambda original: _timed(original, 'to_json')),
+    (Prodict, '__getattr__', _counting_getattr),
+    (Prodict, '__deepcopy__', _counting_deepcopy),
+    (CompactProdict, 'set_attribute', _counting_set_attribute),
+    (CompactProdict, 'to_dict', lambda original: _timed(original, 'to_dict')),
+    (CompactProdict, 'to_json', lambda original: _timed(original, 'to_json')),
+    (CompactProdict, '__getattr__', _counting_getattr),
+    (CompactProdict, '__setstate__', _counting_setstate),
+]
+
+
+def enable_stats():
+    """
+    Starts counting, per class, constructions, conversions by the kind of
+    converter, 'to_dict' and 'to_json' calls and their time, '__getattr__'
+    misses and deep copies. Counting replaces the functions involved, so
+    nothing is paid while it is disabled.
+    Constructions are counted however instances are made, copies and
+    unpickled instances included.
+    Conversions are not counted for classes defined with 'codegen=True' or
+    'lazy=True', which convert outside of the counted functions.
+    """
+    if _uninstrumented:
+        return
+    module = globals()
+    for owner, name, replacement in _INSTRUMENTED:
+        key = name if owner is None else (owner, name)
+        original = module[name] if owner is None else owner.__dict__[name]
+        _uninstrumented[key] = original
+        if owner is None:
+            module[name] = replacement(original)
+        else:
+            setattr(owner, name, replacement(original))
+    _drop_generated(Prodict)
+
+
+def disable_stats():
+    """
+    Stops counting and puts the original functions back. Counters are kept.
+    """
+    if not _uninstrumented:
+        return
+    module = globals()
+    while _uninstrumented:
+        key, original = _uninstrumented.popitem()
+        if isinstance(key, tuple):
+            setattr(key[0], key[1], original)
+        else:
+            module[key] = original
+    _drop_generated(Prodict)
+
+
+def _drop_generated(cls):
+    # Generated code refers to '_allocate' as it was when it was generated
+    stack = [cls]
+    while stack:
+        cls = stack.pop()
+        cls.__prodict_generated__ = None
+        stack.extend(cls.__subclasses__())
+
+
+def reset_stats():
+    _stats.clear()
+
+
+def stats() -> dict:
+    """
+    Returns a snapshot of the counters, by the full name of the class.
+    Counters of classes with the same name, like models made again, are added up.
+    """
+    result = {}
+    for cls, counters in list(_stats.items()):
+        name = '{}.{}'.format(cls.__module__, cls.__qualname__)
+        total = result.get(name)
+        if total is None:
+            result[name] = dict(counters, conversions=dict(counters['conversions']))
+            continue
+        for key, value in counters.items():
+            if key == 'conversions':
+                for kind, count in value.items():
+                    total['conversions'][kind] = total['conversions'].get(kind, 0) + count
+            else:
+                total[key] += value
+    return result
+
+
+@contextmanager
+def collect_stats():
+    """
+    Counts like 'enable_stats' inside the with block, starting from zero.
+    The yielded dict is filled with the 'stats' of the block when it exits,
+    and the counters and the state from before the block are restored.
+    """
+    was_enabled = bool(_uninstrumented)
+    saved = dict(_stats)
+    _stats.clear()
+    enable_stats()
+    result = {}
+    try:
+        yield result
+    finally:
+        result.update(stats())
+        if not was_enabled:
+            disable_stats()
+        _stats.clear()
+        _stats.update(saved)
+
+
+_MODEL_TYPES = (Prodict, CompactProdict)
+
+set_json_backend()
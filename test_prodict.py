@@ -1,9 +1,12 @@
 import pickle
 from unittest import TestCase
-from typing import List, Any, Tuple
+from typing import List, Any, Tuple, Dict, Optional, Union, Set, FrozenSet
+import sys
 import unittest
 from datetime import datetime
-from prodict import Prodict
+from decimal import Decimal
+import prodict
+from prodict import Prodict, CompactProdict, FrozenProdict, ValidationError
 import copy
 
 
@@ -90,6 +93,23 @@ class Recursive(Prodict):
     simple_key: SimpleKeyValue
 
 
+class CompactRam(CompactProdict):
+    brand: str
+    capacity: int
+    unit: str = 'GB'
+
+
+class CompactComputer(CompactProdict):
+    brand: str
+    rams: List[CompactRam]
+    cpu: Cpu
+
+
+class TrackedRam(Prodict, track_changes=True):
+    brand: str
+    capacity: int
+
+
 class TestProdict(TestCase):
     def test_deep_recursion_from_dict(self):
         computer_dict = {
@@ -490,3 +510,1150 @@ class TestProdict(TestCase):
             # print(decoded)
         except:
             assert False
+
+    def test_compiled_fields(self):
+        assert set(Computer.__prodict_fields__) == set(Computer.attr_names())
+        assert SimpleKeyValue.__prodict_fields__['int_key'] is int
+        assert AnyType.__prodict_fields__['a'] is None
+        assert Prodict.__prodict_fields__ == {}
+
+        computer = Computer()
+        computer.cpu = {'brand': 'AMD', 'cores': [{'threads': '2'}]}
+        assert type(computer.cpu) == Cpu
+        assert type(computer.cpu.cores[0]) == CpuCore
+        assert computer.cpu.cores[0].threads == 2
+
+    def test_rebuild_fields(self):
+        class Late(Prodict):
+            a: int
+
+        Late.__annotations__['b'] = float
+        assert not Late.has_attr('b')
+        Late.rebuild_fields()
+        assert Late.has_attr('b')
+        assert Late(b='1.5').b == 1.5
+
+        class LateChild(Late):
+            c: str
+
+        Late.__annotations__['a'] = float
+        Late.rebuild_fields()
+        assert LateChild(a='2.5', c=1) == {'a': 2.5, 'b': None, 'c': '1'}
+        assert LateChild.attr_type('a') is float
+
+    def test_construction_single_pass(self):
+        ram = Ram(extra={'a': 1}, capacity='4')
+        assert list(ram.keys()) == ['extra', 'capacity', 'brand', 'unit']
+        assert ram.capacity == 4
+        assert ram.brand is None
+        assert type(ram.extra) == Prodict
+
+        # Annotated attributes given positionally are reset, others are kept as they are
+        ram = Ram({'brand': 'Samsung', 'raw': {'a': 1}})
+        assert ram.brand is None
+        assert type(ram.raw) == dict
+
+        class WithInit(Prodict):
+            a: int
+            b: str
+
+            def init(self):
+                assert self.a is None
+                self.a = 1
+                self.b = 'default'
+
+        assert WithInit(a='2') == {'a': 2, 'b': 'default'}
+        assert WithInit.from_dict({'b': 'given'}) == {'a': 1, 'b': 'given'}
+
+        with self.assertRaises(TypeError):
+            Ram.from_dict({'items': 1})
+
+    def test_from_dict_custom_init(self):
+        class CustomInit(Prodict):
+            a: int
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.b = 'set in __init__'
+
+        ci = CustomInit.from_dict({'a': '1'})
+        assert ci.a == 1
+        assert ci.b == 'set in __init__'
+        assert CustomInit.from_dict({'a': '1'}, validate=True) == {'a': 1, 'b': 'set in __init__'}
+        with self.assertRaises(prodict.ValidationError):
+            CustomInit.from_dict({'a': 'x'}, validate=True)
+
+    def test_custom_set_attribute(self):
+        class Upper(Prodict, codegen=True):
+            name: str
+
+            def set_attribute(self, attr_name, value):
+                if isinstance(value, str):
+                    value = value.upper()
+                super().set_attribute(attr_name, value)
+
+        assert Upper(name='abc') == {'name': 'ABC'}
+        assert Upper.from_dict({'name': 'abc', 'other': 'x'}) == {'name': 'ABC', 'other': 'X'}
+        assert Upper.from_dicts([{'name': 'abc'}]) == [{'name': 'ABC'}]
+        assert Upper.from_dict({}) == {'name': None}
+
+    def test_from_dicts(self):
+        rows = [{'brand': 'Kingston', 'capacity': str(i), 'unit': 'GB', 'extra': {'a': i}} for i in range(5)]
+        rams = Ram.from_dicts(rows)
+        assert rams == [Ram.from_dict(row) for row in rows]
+        assert all(type(ram) == Ram and type(ram.extra) == Prodict for ram in rams)
+        assert [ram.capacity for ram in rams] == list(range(5))
+        assert Ram.from_dicts([]) == []
+
+        cpu = Cpu.from_dict({'cores': ({'threads': '2'}, {'clock': '3.1'})})
+        assert [type(core) for core in cpu.cores] == [CpuCore, CpuCore]
+        assert cpu.cores[0].threads == 2
+        assert cpu.cores[1].clock == 3.1
+
+    def test_iter_from_dicts(self):
+        import itertools
+
+        def endless_rows():
+            for i in itertools.count():
+                yield {'capacity': i}
+
+        first_three = list(itertools.islice(Ram.iter_from_dicts(endless_rows()), 3))
+        assert [ram.capacity for ram in first_three] == [0, 1, 2]
+        assert all(type(ram) == Ram and ram.brand is None for ram in first_three)
+
+    def test_workers(self):
+        rows = [{'brand': 'Kingston', 'capacity': str(i)} for i in range(20)]
+        threshold = prodict.PARALLEL_THRESHOLD
+        prodict.PARALLEL_THRESHOLD = 10
+        try:
+            rams = Ram.from_dicts(iter(rows), workers=2)
+            assert rams == Ram.from_dicts(rows)
+            assert type(rams[0]) == Ram
+            assert Ram.to_dicts(rams, workers=2) == Ram.to_dicts(rams) == [dict(ram) for ram in rams]
+            assert CompactRam.from_dicts(rows, workers=2)[19].capacity == 19
+            assert CompactRam.to_dicts(CompactRam.from_dicts(rows), workers=2, exclude_none=True)[0] == \
+                {'brand': 'Kingston', 'capacity': 0, 'unit': 'GB'}
+
+            rows[3]['capacity'] = 'x'
+            rows[15]['capacity'] = 'y'
+            with self.assertRaises(ValidationError) as raised:
+                Ram.from_dicts(rows, validate=True, workers=2)
+            assert [path for path, _ in raised.exception.errors] == ['[3].capacity', '[15].capacity']
+        finally:
+            prodict.PARALLEL_THRESHOLD = threshold
+
+        class Local(Prodict):
+            a: int
+
+        with self.assertRaises(TypeError):
+            Local.from_dicts([{'a': 1}], workers=2)
+        with self.assertRaises(TypeError):
+            Prodict.to_dicts([Local(a=1)], workers=2)
+
+    def test_codegen(self):
+        import linecache
+
+        class GenRam(Prodict, codegen=True):
+            brand: str
+            capacity: int
+            unit: str
+
+        class GenComputer(Prodict, codegen=True):
+            brand: str
+            rams: List[GenRam]
+            main: GenRam
+            tags: Set[str]
+
+        class SameShape(GenRam):
+            pass
+
+        class Node(Prodict, codegen=True):
+            name: str
+
+        Node.__annotations__['child'] = Node
+        Node.rebuild_fields()
+
+        class WithInit(GenRam):
+            def init(self):
+                self.unit = 'GB'
+
+        data = {'rams': [{'capacity': '4'}, None], 'brand': 'acme', 'main': {'brand': 'k'}, 'tags': ['a']}
+        computer = GenComputer.from_dict(data)
+        assert list(computer) == ['brand', 'rams', 'main', 'tags']
+        assert type(computer.rams[0]) == GenRam and computer.rams[0].capacity == 4
+        assert computer.rams[1] is None
+        assert computer.tags == {'a'}
+        assert GenComputer.from_dicts([data]) == [computer] == list(GenComputer.iter_from_dicts([data]))
+        assert GenRam(capacity='2') == {'brand': None, 'capacity': 2, 'unit': None}
+        assert GenRam({'unit': 'GB'}, capacity=1) == {'unit': None, 'capacity': 1, 'brand': None}
+
+        tree = computer.to_dict(is_recursive=True)
+        assert type(tree['main']) == dict and type(tree['rams'][0]) == dict
+        assert tree == {'brand': 'acme', 'rams': [{'brand': None, 'capacity': 4, 'unit': None}, None],
+                        'main': {'brand': 'k', 'capacity': None, 'unit': None}, 'tags': {'a'}}
+        extra = GenRam.from_dict({'capacity': 1, 'extra': {'a': [Prodict(b=1)]}})
+        assert type(extra.extra) == Prodict
+        assert extra.to_dict(is_recursive=True) == {'brand': None, 'capacity': 1, 'unit': None,
+                                                    'extra': {'a': [{'b': 1}]}}
+        assert type(extra.to_dict(is_recursive=True)['extra']['a'][0]) == dict
+        with self.assertRaises(TypeError):
+            GenRam.from_dict({'items': 1})
+
+        source = GenComputer.generated_source()
+        assert "get('rams')" in source
+        assert SameShape.generated_source() == GenRam.generated_source()
+        assert GenComputer.__prodict_generated__.build.__code__.co_filename in linecache.cache
+
+        node = Node.from_dict({'name': 'a', 'child': {'name': 'b'}})
+        assert type(node.child) == Node
+        assert Node.__prodict_generated__.dump is None
+        assert node.to_dict(is_recursive=True) == {'name': 'a', 'child': {'name': 'b', 'child': None}}
+        assert WithInit(capacity=1).unit == 'GB'
+        assert WithInit.from_dicts([{}])[0].unit == 'GB'
+        with self.assertRaises(TypeError):
+            Ram.generated_source()
+
+    def test_lazy(self):
+        class LazyCpu(Prodict, lazy=True):
+            brand: str
+            cache: int
+            cores: List[CpuCore]
+
+        class LazyComputer(Prodict, lazy=True):
+            brand: str
+            cpu: LazyCpu
+            rams: List[Ram]
+
+        raw_cpu = {'brand': 'Intel', 'cache': '3', 'cores': [{'threads': '2'}]}
+        computer = LazyComputer.from_dict({'brand': 'acme', 'cpu': raw_cpu, 'dyn': {'a': 1}})
+        # scalar values are converted right away, nested ones are kept as they are
+        assert dict.__getitem__(computer, 'cpu') is raw_cpu
+        assert type(dict.__getitem__(computer, 'dyn')) == dict
+
+        cpu = computer.cpu
+        assert type(cpu) == LazyCpu
+        assert cpu is computer['cpu']
+        assert cpu.cache == 3
+        assert type(dict.__getitem__(cpu, 'cores')) == list
+        assert type(cpu.get('cores')[0]) == CpuCore
+        assert cpu.cores[0].threads == 2
+
+        assert type(computer.get('dyn')) == Prodict
+        assert computer.rams is None
+
+        computer = LazyComputer.from_dict({'cpu': raw_cpu})
+        computer.cpu = {'brand': 'AMD'}
+        assert type(computer.cpu) == LazyCpu and computer.cpu.brand == 'AMD'
+
+        computer = LazyComputer.from_dict({'cpu': raw_cpu})
+        assert computer.to_dict(is_recursive=True)['cpu']['cores'][0]['threads'] == 2
+        assert type(LazyComputer(cpu=raw_cpu).pop('cpu')) == LazyCpu
+        assert all(type(v) != dict for v in LazyComputer(cpu=raw_cpu).values())
+
+        class EagerAgain(LazyComputer, lazy=False):
+            pass
+
+        assert type(dict.__getitem__(EagerAgain(cpu=raw_cpu), 'cpu')) == LazyCpu
+
+        class Counts(Prodict, lazy=True):
+            counts: List[int]
+
+        for write in (lambda lz: lz.__setitem__('counts', 'abc'), lambda lz: lz.update(counts='abc'),
+                      lambda lz: lz.setdefault('other', 1) and lz.update({'counts': 'abc'})):
+            lz = Counts(counts=['1'])
+            write(lz)
+            assert lz.counts == 'abc'
+        lz = Counts(counts=['1'])
+        lz |= {'counts': 'abc'}
+        assert lz.counts == 'abc'
+        lz = Counts(counts=['1'])
+        del lz['counts']
+        lz['counts'] = 'x'
+        assert lz.counts == 'x' and Counts(counts=['1']).popitem() == ('counts', [1])
+
+        class EagerCpu(Prodict):
+            brand: str
+            cache: int
+            cores: List[CpuCore]
+
+        assert LazyCpu.from_dict(raw_cpu) == EagerCpu.from_dict(raw_cpu)
+        assert not LazyCpu.from_dict(raw_cpu) != EagerCpu.from_dict(raw_cpu)
+        copied = LazyCpu.from_dict(raw_cpu).copy()
+        assert type(dict.__getitem__(copied, 'cores')[0]) == CpuCore
+        assert list(LazyCpu.from_dict(raw_cpu).items()) == list(EagerCpu.from_dict(raw_cpu).items())
+
+    def test_to_dict_recursive_containers(self):
+        class Node(Prodict):
+            name: str
+            child: Prodict
+
+        tree = Node(name='root', child=None)
+        tree.children = [Node(name='a'), (Node(name='b'), [Node(name='c')])]
+        tree.mapping = {'d': Node(name='d')}
+
+        d = tree.to_dict(is_recursive=True)
+        assert type(d['children'][0]) == dict
+        assert type(d['children'][1]) == tuple
+        assert type(d['children'][1][0]) == dict
+        assert type(d['children'][1][1][0]) == dict
+        assert type(d['mapping']['d']) == dict
+        assert d['children'][0] == {'name': 'a', 'child': None}
+
+        d = tree.to_dict(is_recursive=True, exclude_none=True)
+        assert d['children'][1][1][0] == {'name': 'c'}
+
+        # exclude_none_in_lists is applied at every depth
+        parent = Prodict(nested=Node(name='n', children=[Node(name='e')]))
+        d = parent.to_dict(is_recursive=True, exclude_none_in_lists=True)
+        assert d == {'nested': {'name': 'n', 'child': None, 'children': [{'name': 'e'}]}}
+
+    def test_to_dict_deep_tree(self):
+        import sys
+        root = node = Prodict(level=0)
+        for level in range(1, sys.getrecursionlimit() * 2):
+            node.next = Prodict(level=level)
+            node = node.next
+        d = root.to_dict(is_recursive=True)
+        assert type(d['next']['next']) == dict
+
+    def test_json(self):
+        import json
+        computer_json = json.dumps({
+            'brand': 'acme',
+            'cpu': {'brand': 'Intel', 'cores': [{'threads': '2', 'clock': 3.4}]},
+            'rams': [{'brand': 'Kingston', 'capacity': 4}],
+        })
+        backends = [name for name in prodict.JSON_BACKENDS
+                    if name == 'json' or getattr(prodict, name) is not None]
+        try:
+            for backend in backends:
+                prodict.set_json_backend(backend)
+                computer = Computer.from_json(computer_json)
+                assert type(computer.cpu.cores[0]) == CpuCore
+                assert computer.cpu.cores[0].threads == 2
+                assert json.loads(computer.to_json()) == computer.to_dict(is_recursive=True)
+                assert 'null' not in computer.to_json(exclude_none=True)
+                assert Ram.from_json(b'[{"capacity": "4"}, {}]') == [Ram(capacity=4), Ram()]
+
+                with self.assertRaises(TypeError):
+                    Prodict(price=Decimal('1.5')).to_json()
+                assert json.loads(Prodict(price=Decimal('1.5')).to_json(default=str)) == {'price': '1.5'}
+                keyed = Prodict(counts={1: 'a', 2: 'b'}, big=2 ** 70)
+                assert json.loads(keyed.to_json()) == {'counts': {'1': 'a', '2': 'b'}, 'big': 2 ** 70}
+        finally:
+            prodict.set_json_backend()
+
+        with self.assertRaises(ValueError):
+            prodict.set_json_backend('simdjson')
+
+    def test_json_backends_agree(self):
+        import uuid
+        backends = [name for name in prodict.JSON_BACKENDS
+                    if name == 'json' or getattr(prodict, name) is not None]
+        values = Prodict(
+            price=Decimal('1.5'), at=datetime(2020, 1, 2), id=uuid.UUID(int=1),
+            counts={1: 'a'}, big=2 ** 70, small=1e-7, large=1e20, nan=float('nan'),
+            path='a/b', text='\u00e9\x01', ram=CompactRam(brand='Kingston'), rams=(Ram(capacity=4),),
+        )
+        outputs = set()
+        try:
+            for backend in backends:
+                prodict.set_json_backend(backend)
+                for value in (Decimal('1.5'), datetime(2020, 1, 2), uuid.UUID(int=1)):
+                    with self.assertRaises(TypeError):
+                        Prodict(value=value).to_json()
+                outputs.add(values.to_json(default=str))
+                outputs.add(Prodict(ram=CompactRam(capacity=8), ok=True, n=None).to_json())
+        finally:
+            prodict.set_json_backend()
+        assert len(outputs) == 2
+
+    def test_jsonl(self):
+        import io
+        import json
+        import os
+        import tempfile
+
+        rams = [Ram(brand='Kingston', capacity=i) for i in range(5)]
+        buffer = io.BytesIO()
+        assert prodict.write_jsonl(rams, buffer, batch_size=2) == 5
+        assert buffer.getvalue().count(b'\n') == 5
+        buffer.seek(0)
+        assert list(Ram.read_jsonl(buffer)) == rams
+
+        text = io.StringIO('{"capacity": "1"}\n\n{"capacity": 2}\n')
+        batches = list(Ram.read_jsonl(text, batch_size=1))
+        assert batches == [[Ram(capacity=1)], [Ram(capacity=2)]]
+
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        try:
+            assert list(Ram.read_jsonl(path)) == []
+            prodict.write_jsonl([CompactRam(capacity=4), {'capacity': None}], path, exclude_none=True)
+            with open(path) as f:
+                assert [json.loads(line) for line in f] == [{'capacity': 4, 'unit': 'GB'}, {}]
+            batches = list(CompactRam.read_jsonl(path, batch_size=10))
+            assert len(batches) == 1
+            assert batches[0][0].capacity == 4
+        finally:
+            os.remove(path)
+
+        with self.assertRaises(ValueError):
+            Ram.read_jsonl(io.StringIO(), batch_size=0)
+
+    def test_async(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        data = {'brand': 'acme', 'rams': [{'capacity': str(i)} for i in range(10)] + [None],
+                'cpu': {'cores': [{'threads': '2'}] * 5}, 'extra': {'a': 1}}
+
+        async def stream():
+            yield b'{"capacity": "1"}\n{"capa'
+            yield b'city": 2}\n\n'
+            yield '{"capacity": 3}'
+
+        async def main():
+            ticks = []
+
+            async def ticker():
+                while True:
+                    ticks.append(None)
+                    await asyncio.sleep(0)
+
+            task = asyncio.ensure_future(ticker())
+            computer = await Computer.afrom_dict(data, chunk_size=2)
+            assert len(ticks) >= 5
+            task.cancel()
+            assert computer == Computer.from_dict(data)
+            assert type(computer.rams[0]) == Ram and computer.rams[10] is None
+            assert type(computer.cpu.cores[4]) == CpuCore
+            assert type(computer.extra) == Prodict
+
+            with ThreadPoolExecutor(1) as executor:
+                assert await Computer.afrom_dict(data, executor=executor, chunk_size=3) == computer
+                rams = [ram async for ram in Ram.aread_jsonl(stream(), executor=executor)]
+            assert rams == [Ram(capacity=1), Ram(capacity=2), Ram(capacity=3)]
+            batches = [batch async for batch in Ram.aread_jsonl(stream(), batch_size=2)]
+            assert [len(batch) for batch in batches] == [2, 1]
+            compact = await CompactRam.afrom_dict({'capacity': '4'})
+            assert compact.capacity == 4
+
+        asyncio.run(main())
+
+    def test_pickle_subclass(self):
+        computer = Computer.from_dict({'brand': 'acme', 'cpu': {'cores': [{'threads': 2}]}, 'extra': {'a': 1}})
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            decoded = pickle.loads(pickle.dumps(computer, protocol=protocol))
+            assert decoded == computer
+            assert type(decoded) == Computer
+            assert type(decoded.cpu) == Cpu
+            assert type(decoded.cpu.cores[0]) == CpuCore
+            assert type(decoded.extra) == Prodict
+
+        cyclic = Prodict(a=1)
+        dict.__setitem__(cyclic, 'me', cyclic)
+        decoded = pickle.loads(pickle.dumps(cyclic))
+        assert decoded.me is decoded
+
+        class Required(Prodict):
+            a: int
+
+            def __init__(self, a):
+                super().__init__(a=a)
+
+        assert copy.copy(Required(1)) == {'a': 1}
+
+    def test_copy(self):
+        computer = Computer.from_dict({'brand': 'acme', 'cpu': {'brand': 'Intel'}, 'rams': [{'capacity': 4}]})
+        copied = computer.copy()
+        assert type(copied) == Computer
+        assert copied == computer
+        assert copied.cpu is computer.cpu
+        assert type(copy.copy(computer)) == Computer
+
+    def test_deepcopy_structure(self):
+        computer = Computer.from_dict({'brand': 'acme', 'cpu': {'brand': 'Intel'}, 'rams': [{'capacity': 4}]})
+        computer.shape = (1, 'a')
+        computer['shared'] = computer.cpu
+        copied = copy.deepcopy(computer)
+        assert copied == computer
+        assert type(copied.cpu) == Cpu
+        assert type(copied.rams[0]) == Ram
+        assert copied.cpu is not computer.cpu
+        assert copied.shared is copied.cpu
+        assert copied.rams[0] is not computer.rams[0]
+        assert copied.brand is computer.brand
+        assert copied.shape is computer.shape
+
+    def test_compact(self):
+        ram = CompactRam(capacity='4', color='red')
+        assert not hasattr(ram, '__dict__')
+        assert ram.capacity == 4
+        assert ram.brand is None
+        assert ram.unit == 'GB'
+        assert ram.color == 'red'
+        assert ram['capacity'] == 4
+        assert ram == {'brand': None, 'capacity': 4, 'unit': 'GB', 'color': 'red'}
+        assert list(ram) == ['brand', 'capacity', 'unit', 'color']
+        assert 'color' in ram and 'flavor' not in ram
+        with self.assertRaises(AttributeError):
+            ram.flavor
+        with self.assertRaises(KeyError):
+            ram['flavor']
+
+        ram.brand = 'Kingston'
+        ram.dynamic = {'a': 1}
+        assert type(ram.dynamic) == Prodict
+        del ram['unit']
+        assert 'unit' not in ram.to_dict()
+
+        computer = CompactComputer.from_dict({
+            'brand': 'acme', 'rams': [{'capacity': '8'}], 'cpu': {'cores': [{'threads': '2'}]}
+        })
+        assert type(computer.rams[0]) == CompactRam
+        assert computer.rams[0].capacity == 8
+        assert type(computer.cpu.cores[0]) == CpuCore
+        assert computer.to_dict(is_recursive=True)['rams'][0] == {'brand': None, 'capacity': 8, 'unit': 'GB'}
+        assert '"capacity":8' in computer.to_json().replace(' ', '')
+
+        for decoded in (pickle.loads(pickle.dumps(computer)), copy.deepcopy(computer), computer.copy()):
+            assert type(decoded) == CompactComputer
+            assert decoded == computer
+        assert Prodict(ram=CompactRam(capacity=1)).to_dict(is_recursive=True)['ram']['capacity'] == 1
+
+    def test_shared_keys(self):
+        # Keys built at runtime, like the keys of parsed JSON, are different objects
+        key = ''.join(['capa', 'city'])
+        canonical = Ram.__prodict_keys__['capacity']
+        for ram in (Ram.from_dict({key: 1}), Ram(**{key: 1}), Ram.from_dicts([{key: 1}])[0]):
+            stored, = [k for k in dict.keys(ram) if k == 'capacity']
+            assert stored is canonical and stored is not key
+        ram = Ram()
+        ram[key] = 2
+        assert [k for k in dict.keys(ram) if k == 'capacity'][0] is canonical
+
+        import asyncio
+
+        class InitRam(Ram):
+            def init(self):
+                self.brand = 'acme'
+
+        class SetRam(Ram):
+            def set_attribute(self, attr_name, value):
+                super().set_attribute(attr_name, value)
+
+        for ram in (Ram.from_converted({key: 1}), asyncio.run(Ram.afrom_dict({key: 1})),
+                    Ram.from_dict({key: '1'}, validate=True), Ram([(key, 1)]),
+                    InitRam(**{key: 1}), InitRam([(key, 1)]), InitRam.from_converted({key: 1}),
+                    SetRam(**{key: 1})):
+            stored, = [k for k in dict.keys(ram) if k == 'capacity']
+            assert stored is canonical and stored is not key
+
+        class Tagged(CompactProdict):
+            name: str
+
+        first, second = Tagged(name='a', color='red', size=1), Tagged(size=2)
+        assert first.__prodict_extra__ == ['red', 1] and second.__prodict_extra__[1] == 2
+        assert 'color' not in second and second.get('color') is None
+        assert list(second.keys()) == ['name', 'size'] and second.size == 2
+        del first['color']
+        assert first.to_dict() == {'name': 'a', 'size': 1}
+        with self.assertRaises(KeyError):
+            del first['color']
+        first.color = 'blue'
+        assert first == {'name': 'a', 'color': 'blue', 'size': 1}
+
+        many = Tagged(**{'k{}'.format(i): i for i in range(prodict._SHARED_KEYS_MAX + 2)})
+        assert type(many.__prodict_extra__) is dict and many.k31 == 31 and many.k0 == 0
+        assert len(Tagged.__prodict_extra_names__) == prodict._SHARED_KEYS_MAX
+        assert many.copy() == many and Tagged(color='x').color == 'x'
+
+    def test_frozen(self):
+        class Point(FrozenProdict):
+            x: int
+            y: int
+
+        class Shape(FrozenProdict):
+            name: str
+            points: List[Point]
+
+            def init(self):
+                self.name = 'unnamed'
+
+        shape = Shape.from_dict({'points': [{'x': '1', 'y': 2}], 'tags': ['a'], 'meta': {'k': [1]}})
+        assert shape.name == 'unnamed'
+        assert shape.points == (Point(x=1, y=2),)
+        assert type(shape.points[0]) == Point
+        assert shape.tags == ('a',)
+        assert type(shape.meta) == FrozenProdict
+        assert shape.meta.k == (1,)
+
+        for mutate in (lambda: setattr(shape, 'name', 'x'), lambda: shape.update(name='x'),
+                       lambda: shape.__setitem__('name', 'x'), lambda: shape.pop('name'),
+                       lambda: shape.clear(), lambda: shape.__delitem__('name'),
+                       lambda: shape.setdefault('other', 1)):
+            with self.assertRaises(TypeError):
+                mutate()
+
+        same = Shape.from_dict({'points': [{'x': 1, 'y': 2}], 'tags': ['a'], 'meta': {'k': [1]}})
+        assert hash(shape) == hash(same)
+        assert {shape: 'cached'}[same] == 'cached'
+
+        moved = shape.evolve(name='moved', meta={'k': 2})
+        assert moved.name == 'moved'
+        assert type(moved.meta) == FrozenProdict and moved.meta.k == 2
+        assert moved.points is shape.points
+        assert shape.name == 'unnamed'
+
+        # frozen children are shared instead of copied
+        point = Point(x=3, y=4)
+        assert Shape(points=[point]).points[0] is point
+
+        meta = pickle.loads(pickle.dumps(shape.meta))
+        assert type(meta) == FrozenProdict and meta == shape.meta
+        with self.assertRaises(TypeError):
+            meta.k = 3
+        assert hash(copy.deepcopy(shape)) == hash(shape)
+
+        with self.assertRaises(TypeError):
+            class LazyFrozen(FrozenProdict, lazy=True):
+                pass
+
+        class Marker(FrozenProdict):
+            at: Point
+            shapes: Optional[Dict[str, Shape]]
+
+        marker = Marker.from_dict({'at': {'x': '1', 'y': '2'}, 'shapes': {'a': {'points': []}}})
+        assert type(marker.at) == Point and type(marker.shapes['a']) == Shape
+        assert hash(marker) == hash(Marker.from_dict({'at': {'x': 1, 'y': 2}, 'shapes': {'a': {'points': []}}}))
+        for attr_type in (Ram, List[Ram], Optional[Dict[str, CompactRam]]):
+            with self.assertRaises(TypeError):
+                type('Mutable', (FrozenProdict,), {'__annotations__': {'child': attr_type}})
+
+    def test_inherited_annotations(self):
+        class Base(Prodict):
+            a: int
+            b: str
+
+        class Child(Base):
+            b: float
+            c: int
+
+        class GrandChild(Child):
+            pass
+
+        assert GrandChild.attr_types() == {'a': int, 'b': float, 'c': int}
+        assert GrandChild.attr_names() == ['a', 'b', 'c']
+        gc = GrandChild(a='1', b='2.5', c='3')
+        assert (gc.a, gc.b, gc.c) == (1, 2.5, 3)
+        assert GrandChild() == {'a': None, 'b': None, 'c': None}
+        assert Base.attr_types() == {'a': int, 'b': str}
+
+    def test_set_default(self):
+        sdv = SimpleKeyDefaultValue()
+        annotations = dict(SimpleKeyDefaultValue.__annotations__)
+        sdv.set_default('int_key')
+        assert sdv['int_key'] == 1
+        assert SimpleKeyDefaultValue.__annotations__ == annotations
+
+    def test_field_properties(self):
+        class Defaults(Prodict):
+            a: int
+            b: int = 42
+            copy: int
+
+        class Child(Defaults):
+            c: str
+
+        d = Defaults(a='1', c=3)
+        assert isinstance(vars(Defaults)['a'], prodict._FieldProperty)
+        assert 'a' not in vars(Child)
+        assert d.a == 1 and d.c == 3
+        assert d.b == 42
+        d.b = 77
+        assert d.b == 42 and d.get('b') == 77
+        assert callable(d.copy)
+
+        del d['a']
+        assert not hasattr(d, 'a') and getattr(d, 'a', 'default') == 'default'
+        with self.assertRaises(AttributeError):
+            d.a
+        assert not hasattr(d, 'missing')
+        with self.assertRaises(AttributeError):
+            d.missing
+
+        assert not Defaults.attr_has_default_value('a')
+        assert Defaults.attr_has_default_value('b')
+        assert Defaults.get_attr_default_value('b') == 42
+        assert Defaults.get_attr_default_value('a') is None
+
+        Child.__annotations__.pop('c')
+        Child.rebuild_fields()
+        assert 'c' not in vars(Child)
+        Child.__annotations__['c'] = str
+        Child.rebuild_fields()
+        assert isinstance(vars(Child)['c'], prodict._FieldProperty)
+
+    def test_track_changes(self):
+        class Part(Prodict, track_changes=True):
+            name: str
+            size: int
+
+        class Machine(Prodict, track_changes=True):
+            name: str
+            main: Part
+            parts: List[Part]
+            extra: dict
+
+            def init(self):
+                self.name = 'unnamed'
+
+        class LazyMachine(Machine, lazy=True):
+            pass
+
+        class Untracked(Machine, track_changes=False):
+            pass
+
+        machine = Machine.from_dict({'main': {'name': 'cpu'}, 'parts': [{'size': 1}, {'size': 2}], 'extra': {'a': 1}})
+        assert machine.changes() == {}
+        machine.main.size = '4'
+        machine.parts[1]['name'] = 'disk'
+        machine.extra.a = 2
+        assert machine.changes() == {'main.size': 4, 'parts[1].name': 'disk'}
+
+        machine.clear_changes()
+        assert machine.changes() == {} and machine.main.changes() == {}
+        machine.update(name='m1')
+        del machine['extra']
+        machine.main = {'name': 'gpu'}
+        machine.main.size = 8
+        assert machine.changes() == {'name': 'm1', 'extra': prodict.DELETED, 'main': Part(name='gpu', size=8)}
+        machine.clear_changes()
+        machine.pop('name')
+        machine.setdefault('name', 'm2')
+        machine.setdefault('name', 'm3')
+        assert list(machine.changes()) == ['name']
+
+        lazy = LazyMachine.from_dict({'main': {'name': 'cpu'}})
+        lazy.main.size = 2
+        assert type(lazy.changes()['main.size']) == int
+
+        untracked = Untracked(name='a')
+        untracked.name = 'b'
+        with self.assertRaises(TypeError):
+            untracked.changes()
+        with self.assertRaises(TypeError):
+            class FrozenTracked(FrozenProdict, track_changes=True):
+                pass
+
+        restored = pickle.loads(pickle.dumps(TrackedRam(brand='a')))
+        assert restored == {'brand': 'a', 'capacity': None} and restored.changes() == {}
+        restored.capacity = 1
+        assert restored.changes() == {'capacity': 1}
+
+        class Custom(Prodict, track_changes=True):
+            changes: int
+
+            def update(self, *args, **kwargs):
+                dict.__setitem__(self, 'updated', True)
+
+        custom = Custom()
+        custom.update(a=1)
+        assert custom['updated'] and 'a' not in custom
+
+        class Plain(Prodict):
+            changes: str
+            clear_changes: str
+
+        assert Plain(changes='a').changes == 'a' and Plain(clear_changes='b').clear_changes == 'b'
+
+        class LazyCustom(Prodict, lazy=True):
+            def get(self, key, default=None):
+                return 'custom'
+
+        assert LazyCustom(a=1).get('a') == 'custom'
+
+        with prodict.collect_stats():
+            class Counted(Machine, track_changes=False):
+                pass
+        assert Counted.set_attribute is Prodict.set_attribute
+
+        class Upper(Prodict):
+            name: str
+
+            def set_attribute(self, attr_name, value):
+                super().set_attribute(attr_name, value.upper() if isinstance(value, str) else value)
+
+        class TrackedUpper(Upper, track_changes=True):
+            pass
+
+        upper = TrackedUpper(name='a')
+        upper.name = 'b'
+        assert upper.name == 'B' and TrackedUpper.set_attribute is Upper.set_attribute
+
+        untracked = Untracked(name='a')
+        untracked['name'] = 'b'
+        untracked.update(extra={})
+        untracked.pop('name')
+        assert '__prodict_changes__' not in untracked.__dict__
+        assert Untracked.__setitem__ is dict.__setitem__ and Untracked.update is dict.update
+
+        part = Part(name='a')
+        part |= {'size': '3'}
+        assert part.changes() == {'size': '3'} and type(part) == Part
+
+        class LazyPart(Part, lazy=True):
+            parts: List[Part]
+
+        lazy_part = LazyPart(parts=[{'size': 1}])
+        lazy_part['parts'] = 'raw'
+        assert lazy_part.parts == 'raw' and lazy_part.changes() == {'parts': 'raw'}
+
+    def test_make_model(self):
+        Point = Prodict.make_model('Point', {'x': int, 'y': int})
+        assert Point.__name__ == 'Point' and issubclass(Point, Prodict)
+        assert Point(x='1') == {'x': 1, 'y': None}
+        assert Prodict.make_model('Point', {'x': int, 'y': int}) is Point
+        assert Prodict.make_model('Point', {'y': int, 'x': int}) is not Point
+        assert Prodict.make_model('Point', {'x': int, 'y': int}, lazy=True).__prodict_lazy__
+        CompactPoint = CompactProdict.make_model('Point', {'x': int})
+        assert CompactPoint(x='2').x == 2 and CompactPoint is not Point
+
+        size = prodict.MODEL_CACHE_SIZE
+        prodict.MODEL_CACHE_SIZE = 2
+        try:
+            Prodict.make_model('A', {})
+            Prodict.make_model('B', {})
+            Prodict.make_model('C', {})
+            assert len(prodict._model_cache) == 2
+            assert Prodict.make_model('C', {}) is Prodict.make_model('C', {})
+        finally:
+            prodict.MODEL_CACHE_SIZE = size
+
+    def test_model_from_schema(self):
+        schema = {
+            'title': 'Machine',
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string'},
+                'cpu': {'type': 'object', 'title': 'Processor', 'properties': {'cores': {'type': 'integer'}}},
+                'disks': {'type': 'array', 'items': {'type': 'object', 'properties': {'size': {'type': 'number'}}}},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+                'price': {'type': ['number', 'null']},
+                'id': {'anyOf': [{'type': 'integer'}, {'type': 'string'}]},
+                'meta': {'type': 'object'},
+                'other': {},
+            },
+        }
+        Machine = Prodict.model_from_schema(schema)
+        assert Machine.__name__ == 'Machine'
+        types = Machine.attr_types()
+        assert types['tags'] == List[str]
+        assert types['price'] == Optional[float]
+        assert types['id'] == Union[int, str]
+        assert types['meta'] is dict and types['other'] is Any
+        machine = Machine.from_dict({'cpu': {'cores': '4'}, 'disks': [{'size': '1.5'}], 'meta': {'a': 1}})
+        assert type(machine.cpu).__name__ == 'Processor' and machine.cpu.cores == 4
+        assert type(machine.disks[0]).__name__ == 'DisksItem' and machine.disks[0].size == 1.5
+        assert type(machine.meta) == Prodict
+        assert Prodict.model_from_schema(dict(schema)) is Machine
+        assert Prodict.model_from_schema(dict(schema, title='Other')) is not Machine
+
+    def test_view(self):
+        data = {'brand': 'acme', 'cpu': {'cores': [{'threads': '2'}, None]}, 'rams': [{'capacity': '4'}],
+                'extra': {'a': [1]}}
+        view = prodict.view(Computer, data)
+        assert view.brand == 'acme' and view['brand'] == 'acme'
+        assert view.cpu.cores[0].threads == 2 and view.cpu.cores[1] is None
+        assert view.cpu.cores[-2] is view.cpu.cores[0]
+        assert view.rams[0].capacity == 4 and len(view.rams) == 1
+        assert view.extra.a == [1] and isinstance(view.extra, prodict.ProdictView)
+        assert view.uninitialized is None and 'uninitialized' in view
+        assert view.get('missing', 1) == 1
+        with self.assertRaises(AttributeError):
+            view.missing
+        with self.assertRaises(KeyError):
+            view['missing']
+        assert set(view.keys()) == set(Computer.attr_names()) | {'extra'}
+        assert view.to_dict() is data
+        assert view == data
+        assert data['cpu']['cores'][0]['threads'] == '2'
+
+        view.cpu.cores[0].threads = '8'
+        view.rams[0].unit = 'GB'
+        result = view.to_dict()
+        assert result is not data and data['cpu']['cores'][0]['threads'] == '2'
+        assert result['cpu']['cores'][0]['threads'] == 8
+        assert result['rams'][0] == {'capacity': '4', 'unit': 'GB'}
+        assert result['extra'] is data['extra']
+        view.brand = None
+        del view['extra']
+        assert view.to_dict()['brand'] is None and 'extra' not in view.to_dict() and 'extra' in data
+
+        model = view.to_model()
+        assert type(model) == Computer and type(model.rams[0]) == Ram and model.rams[0].capacity == 4
+        assert prodict.view(CompactRam, {'capacity': '1'}).capacity == 1
+        for copied in (copy.copy(view), copy.deepcopy(view), pickle.loads(pickle.dumps(view))):
+            assert type(copied) is prodict.ProdictView and copied == view.to_dict()
+        assert prodict.view(Ram, {'items': [1]})['items'] == [1]
+
+        class Viewed(Prodict):
+            view: str
+
+        assert Viewed(view='x').view == 'x'
+        with self.assertRaises(TypeError):
+            prodict.view(FrozenProdict, {'a': 1}).a = 2
+
+        class Settings(Prodict):
+            options: Dict[str, Any]
+
+        data = {'dict_key': {'info': 'old', 'nested': {'a': 1}}}
+        view = prodict.view(Computer, data)
+        view.dict_key.info = 'new'
+        view.dict_key.nested.a = 2
+        assert view.to_dict()['dict_key'] == {'info': 'new', 'nested': {'a': 2}}
+        assert data['dict_key'] == {'info': 'old', 'nested': {'a': 1}}
+        settings = prodict.view(Settings, {'options': {'debug': False}})
+        settings.options.debug = True
+        assert settings.to_dict() == {'options': {'debug': True}}
+
+    def test_frame(self):
+        rows = [{'brand': 'acme', 'capacity': str(i), 'unit': 'GB', 'extra': i} for i in range(5)]
+        frame = prodict.ProdictFrame.from_dicts(Ram, rows, use_numpy=False)
+        assert len(frame) == 5 and repr(frame) == 'ProdictFrame(Ram, 5 rows)'
+        assert list(frame['capacity']) == [0, 1, 2, 3, 4] and frame['capacity'].typecode == 'q'
+        row = frame[-2]
+        assert type(row) == Ram and row == {'brand': 'acme', 'capacity': 3, 'unit': 'GB'}
+        with self.assertRaises(IndexError):
+            frame[5]
+        assert frame.to_dicts()[0] == {'brand': 'acme', 'capacity': 0, 'unit': 'GB'}
+        assert [ram.capacity for ram in frame.rows()] == [0, 1, 2, 3, 4]
+        assert len(frame[1:3]) == 2 and frame[1:3][0].capacity == 1
+
+        assert frame.where('capacity', '>=', 3).to_dicts() == frame.to_dicts()[3:]
+        assert frame.filter(frame.mask('capacity', 'in', {1, 4}))['capacity'].tolist() == [1, 4]
+        assert frame.sum('capacity') == 10 and frame.mean('capacity') == 2 and frame.max('capacity') == 4
+        assert frame.where('capacity', '>', 9).min('capacity') is None
+
+        frame = prodict.ProdictFrame.from_dicts(Ram, rows + [{'brand': 'other'}], use_numpy=False)
+        assert type(frame['capacity']) is list and frame[5].capacity is None
+        assert frame.count('capacity') == 5 and frame.sum('capacity') == 10
+        assert len(frame.where('capacity', '<', 2)) == 2 and len(frame.where('brand', '!=', 'acme')) == 1
+        assert prodict.ProdictFrame.from_models(Ram, frame.rows(), use_numpy=False).to_dicts() == frame.to_dicts()
+
+        frame = prodict.ProdictFrame.from_dicts(CompactRam, [{'capacity': 1}], use_numpy=False)
+        assert frame.to_dicts() == [CompactRam.from_dict({'capacity': 1}).to_dict()]
+        assert frame[0].unit == 'GB'
+        if prodict.numpy is None:
+            with self.assertRaises(ImportError):
+                prodict.ProdictFrame.from_dicts(Ram, iter(rows), use_numpy=True)
+
+    def test_stats(self):
+        populate = prodict._populate
+        to_dict = Prodict.__dict__['to_dict']
+        with prodict.collect_stats() as stats:
+            computer = Computer.from_dict({'brand': 'acme', 'cpu': {'cores': [{'threads': '2'}]}, 'rams': [{}, {}]})
+            computer.brand = 'other'
+            computer.to_dict(is_recursive=True)
+            CompactRam.from_dicts([{'capacity': '1'}]).pop().to_json()
+            assert not hasattr(computer, 'missing')
+            copy.deepcopy(computer.cpu)
+        assert prodict._populate is populate and Prodict.__dict__['to_dict'] is to_dict
+        assert prodict.stats() == {}
+
+        computer_stats = stats['test_prodict.Computer']
+        assert computer_stats['constructions'] == 1
+        assert computer_stats['conversions'] == {'str': 2, 'model': 1, 'items': 1}
+        assert computer_stats['to_dict'] == 1 and computer_stats['to_dict_seconds'] > 0
+        assert computer_stats['getattr_misses'] == 1
+        assert stats['test_prodict.Ram']['constructions'] == 2
+        assert stats['test_prodict.CpuCore']['conversions'] == {'int': 1}
+        assert stats['test_prodict.Cpu']['deepcopies'] == 1
+        assert stats['test_prodict.CompactRam']['constructions'] == 1
+        assert stats['test_prodict.CompactRam']['to_json'] == 1
+
+        prodict.enable_stats()
+        try:
+            Ram(capacity=1)
+            with prodict.collect_stats() as inner:
+                Ram()
+            assert inner['test_prodict.Ram']['constructions'] == 1
+            assert prodict.stats()['test_prodict.Ram']['constructions'] == 1
+            prodict.reset_stats()
+            assert prodict.stats() == {}
+        finally:
+            prodict.disable_stats()
+        assert prodict._populate is populate
+
+    def test_stats_construction_paths(self):
+        import asyncio
+        import gc
+
+        class Generated(Prodict, codegen=True):
+            capacity: int
+
+        Generated.from_dict({'capacity': '1'})
+        with prodict.collect_stats() as stats:
+            Generated.from_dict({'capacity': '1'})
+            Generated.from_dicts([{'capacity': '2'}, {'capacity': '3'}])
+            Ram.from_converted({'capacity': 1})
+            Ram.from_dict({'capacity': '1'}, validate=True)
+            asyncio.run(Ram.afrom_dict({'capacity': '1'}))
+            CompactRam.from_converted({'capacity': 1})
+            pickle.loads(pickle.dumps(CompactRam(capacity=1)))
+        assert stats['test_prodict.' + Generated.__qualname__]['constructions'] == 3
+        assert stats['test_prodict.Ram']['constructions'] == 3
+        assert stats['test_prodict.CompactRam']['constructions'] == 3
+
+        def make_model():
+            class Made(Prodict):
+                a: int
+
+            return Made
+
+        prodict.enable_stats()
+        try:
+            make_model()(a=1)
+            make_model()(a='2')
+            name = 'test_prodict.' + make_model.__qualname__ + '.<locals>.Made'
+            assert prodict.stats()[name]['constructions'] == 2
+            assert prodict.stats()[name]['conversions'] == {'int': 2}
+            gc.collect()
+            assert name not in prodict.stats()
+        finally:
+            prodict.disable_stats()
+            prodict.reset_stats()
+
+    def test_typed_containers(self):
+        class Typed(Prodict):
+            by_name: Dict[str, Ram]
+            counts: Dict[str, int]
+            optional_ram: Optional[Ram]
+            optional_int: Optional[int]
+            number: Union[int, float]
+            int_or_list: Union[int, List[int]]
+            tags: Set[str]
+            frozen_tags: FrozenSet[int]
+            matrix: List[List[int]]
+            pair: Tuple[int, str]
+            many: Tuple[int, ...]
+            grouped: Dict[str, List[Ram]]
+            maybe_ints: List[Optional[int]]
+
+        typed = Typed.from_dict({
+            'by_name': {'a': {'capacity': '4'}},
+            'counts': {'x': '1', 'y': 2},
+            'optional_ram': {'capacity': '8'},
+            'optional_int': '3',
+            'number': '1.5',
+            'int_or_list': ['1', '2'],
+            'tags': ['a', 'b', 'a'],
+            'frozen_tags': ['1'],
+            'matrix': [['1', '2'], ['3']],
+            'pair': ['1', 2],
+            'many': ['1', '2', '3'],
+            'grouped': {'g': [{'capacity': '1'}, None]},
+            'maybe_ints': ['1', None],
+        })
+        assert type(typed.by_name) == dict
+        assert type(typed.by_name['a']) == Ram and typed.by_name['a'].capacity == 4
+        assert typed.counts == {'x': 1, 'y': 2}
+        assert type(typed.optional_ram) == Ram and typed.optional_ram.capacity == 8
+        assert typed.optional_int == 3
+        assert typed.number == 1.5
+        assert typed.int_or_list == [1, 2]
+        assert typed.tags == {'a', 'b'}
+        assert typed.frozen_tags == frozenset({1})
+        assert typed.matrix == [[1, 2], [3]]
+        assert typed.pair == (1, '2')
+        assert typed.many == (1, 2, 3)
+        assert type(typed.grouped['g'][0]) == Ram and typed.grouped['g'][1] is None
+        assert typed.maybe_ints == [1, None]
+
+        assert Typed(number=2).number == 2
+        with self.assertRaises(ValueError):
+            Typed(number='not a number')
+        with self.assertRaises(ValueError):
+            Typed(pair=[1, 'a', 'extra'])
+
+    def test_model_list_items(self):
+        calls = []
+
+        class Counted(Prodict):
+            capacity: int
+
+            def init(self):
+                calls.append(self)
+
+        class Holder(Prodict):
+            rams: List[Ram]
+            counted: List[Counted]
+
+        with self.assertRaises(AttributeError):
+            Holder(rams=[1])
+        with self.assertRaises(AttributeError):
+            Holder(rams=[{'capacity': 1}, 'not a ram'])
+        holder = Holder(rams=[None, Ram(capacity=1), CompactRam(capacity=2), {'capacity': '3'}])
+        assert holder.rams[0] is None and [ram.capacity for ram in holder.rams[1:]] == [1, 2, 3]
+        assert all(type(ram) == Ram for ram in holder.rams[1:])
+        with self.assertRaises(TypeError):
+            Holder(counted=[{'capacity': 1}, {'capacity': [1]}])
+        assert len(calls) == 2
+
+        class Either(Prodict):
+            value: Union[List[Ram], str]
+
+        assert Either(value=[{'capacity': '1'}]).value == [Ram(capacity=1)]
+        assert Either(value=[1]).value == '[1]'
+
+    @unittest.skipIf(sys.version_info < (3, 10), 'PEP 604 and builtin generics need Python 3.10+')
+    def test_builtin_generics(self):
+        class Builtin(Prodict):
+            rams: list[Ram] | None
+            counts: dict[str, int]
+            either: int | str
+
+        builtin = Builtin.from_dict({'rams': [{'capacity': '2'}], 'counts': {'a': '1'}, 'either': 'x'})
+        assert type(builtin.rams[0]) == Ram and builtin.rams[0].capacity == 2
+        assert builtin.counts == {'a': 1}
+        assert builtin.either == 'x'
+
+    def test_validate(self):
+        data = {
+            'brand': 'acme',
+            'cpu': {'cache': 'big', 'cores': [{'clock': '3.1'}, {'threads': 'two', 'clock': 'fast'}]},
+            'rams': [{'capacity': '4'}, 'not a ram'],
+        }
+        with self.assertRaises(ValidationError) as raised:
+            Computer.from_dict(data, validate=True)
+        paths = [path for path, message in raised.exception.errors]
+        assert paths == ['cpu.cache', 'cpu.cores[1].threads', 'cpu.cores[1].clock', 'rams[1]']
+        assert 'cpu.cores[1].threads' in str(raised.exception)
+
+        valid = dict(data, cpu={'cores': [{'clock': '3.1'}]}, rams=[{'capacity': '4'}])
+        computer = Computer.from_dict(valid, validate=True)
+        assert computer == Computer.from_dict(valid)
+        assert type(computer.cpu.cores[0]) == CpuCore and computer.cpu.cores[0].clock == 3.1
+        assert computer.uninitialized is None
+
+        with self.assertRaises(ValidationError) as raised:
+            Ram.from_dicts([{'capacity': 1}, {'capacity': 'x'}, {'capacity': 'y'}], validate=True)
+        assert [path for path, message in raised.exception.errors] == ['[1].capacity', '[2].capacity']
+
+        with self.assertRaises(ValidationError) as raised:
+            CompactComputer.from_dict({'rams': [{'capacity': 'x'}]}, validate=True)
+        assert raised.exception.errors[0][0] == 'rams[0].capacity'
+        assert type(CompactComputer.from_dict({'rams': [{'capacity': '1'}]}, validate=True).rams[0]) == CompactRam
+
+        class Typed(Prodict):
+            counts: Dict[str, int]
+            number: Union[int, float]
+
+            def init(self):
+                self.number = 0
+
+        with self.assertRaises(ValidationError) as raised:
+            Typed.from_dict({'counts': {'a': 'x'}, 'number': 'nan?'}, validate=True)
+        assert [path for path, message in raised.exception.errors] == ["counts['a']", 'number']
+        assert Typed.from_dict({'counts': {'a': '1'}}, validate=True) == {'counts': {'a': 1}, 'number': 0}